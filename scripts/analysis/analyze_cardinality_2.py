@@ -1,22 +1,22 @@
 
-import pandas as pd
+import os
+import sys
 
-# Load the data
-df = pd.read_csv("../../data/reversed_dickson_values.csv")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dataset import PrimeIndex, read_dataset
 
-# Filter for cardinality 2
-cardinality_2_df = df[df["value_count"] == 2]
+# Load the cardinality-2 rows (the filter is applied while reading)
+cardinality_2_df = read_dataset(["p", "n", "value_count"], value_count=2)
 
-# Get the unique primes where cardinality 2 occurs
-primes = cardinality_2_df["p"].unique()
+# Per-prime offsets of the rows, so each prime below is a slice rather than a scan
+by_prime = PrimeIndex(cardinality_2_df)
 
 # Dictionary to hold the results
 n_sequences = {}
 
 # Find the sequence of n for each prime
-for p in sorted(primes):
-    prime_data = cardinality_2_df[cardinality_2_df["p"] == p]
-    n_values = sorted(prime_data["n"].tolist())
+for p in by_prime.primes:
+    n_values = sorted(by_prime.column(p, "n").tolist())
     n_sequences[p] = n_values
 
 # Print the sequences and analyze them
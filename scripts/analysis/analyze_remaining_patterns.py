@@ -1,15 +1,10 @@
 
-import pandas as pd
-import math
+import os
+import sys
 
-def is_prime(num):
-    """Checks if a number is prime."""
-    if num < 2:
-        return False
-    for i in range(2, int(math.sqrt(num)) + 1):
-        if num % i == 0:
-            return False
-    return True
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dataset import PrimeIndex, read_dataset
+from primes import is_prime
 
 def analyze_remaining_patterns():
     """
@@ -18,18 +13,17 @@ def analyze_remaining_patterns():
     print("Analyzing the remaining 'n' values for non-twin primes...\n")
     
     try:
-        df = pd.read_csv("../../data/reversed_dickson_values.csv")
+        cardinality_2_df = read_dataset(["p", "n", "value_count"], value_count=2)
     except FileNotFoundError:
-        print("Error: 'data/reversed_dickson_values.csv' not found.")
+        print("Error: dataset 'data/reversed_dickson_values' not found.")
         return
 
-    cardinality_2_df = df[df["value_count"] == 2]
-    primes = sorted(cardinality_2_df["p"].unique())
+    by_prime = PrimeIndex(cardinality_2_df)
 
     remaining_n_values = {}
 
-    for p in primes:
-        n_values = set(cardinality_2_df[cardinality_2_df["p"] == p]["n"].tolist())
+    for p in by_prime.primes:
+        n_values = set(by_prime.column(p, "n").tolist())
         
         # Remove the two known patterns
         n1 = (p**2 + 1) / 2
@@ -1,24 +1,12 @@
 
-import pandas as pd
+import os
+import sys
+
 import numpy as np
 
-def is_prime(num):
-    """Checks if a number is prime."""
-    if num < 2:
-        return False
-    for i in range(2, int(num**0.5) + 1):
-        if num % i == 0:
-            return False
-    return True
-
-def get_twin_primes(max_p):
-    """Get a set of twin primes up to a certain limit."""
-    primes = {i for i in range(2, max_p + 1) if is_prime(i)}
-    twin_primes = set()
-    for p in primes:
-        if p + 2 in primes:
-            twin_primes.add(p)
-    return twin_primes
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dataset import read_dataset
+from primes import twin_primes as lower_twin_primes
 
 def pretty_poly_str(coeffs):
     """Creates a human-readable string for a polynomial from its coefficients."""
@@ -63,20 +51,18 @@ def fit_and_print_poly(name, data, degree=2):
 def main():
     # Load data
     try:
-        df = pd.read_csv("../../data/reversed_dickson_values_by_cardinality.csv")
+        # Only p and n are needed; value_count == 2 is filtered while reading
+        card2_df = read_dataset(['p', 'n'], value_count=2)
     except FileNotFoundError:
-        print("Error: 'data/reversed_dickson_values_by_cardinality.csv' not found.")
+        print("Error: dataset 'data/reversed_dickson_values' not found.")
         print("Please run Test.py to generate the data.")
         return
-
-    # Filter for value_count 2
-    card2_df = df[df['value_count'] == 2].copy()
     
     # Group by prime
     grouped = card2_df.groupby('p')['n'].apply(list).to_dict()
 
     max_p = card2_df['p'].max()
-    twin_primes = get_twin_primes(max_p)
+    twin_primes = set(lower_twin_primes(int(max_p)).tolist())
 
     # Prepare lists for each pattern
     pattern1_data = [] # n = (p^2+1)/2
@@ -1,23 +1,15 @@
-import math
-import pandas as pd
-import numpy as np
+import os
+import sys
 
+import numpy as np
 
-def is_prime(n):
-    if n < 2:
-        return False
-    if n % 2 == 0:
-        return n == 2
-    r = int(math.sqrt(n))
-    for i in range(3, r+1, 2):
-        if n % i == 0:
-            return False
-    return True
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dataset import read_dataset
+from primes import is_prime
 
 
-def extract_third_n_non_twin(csv_path="../../data/reversed_dickson_values.csv"):
-    df = pd.read_csv(csv_path)
-    df2 = df[df["value_count"] == 2]
+def extract_third_n_non_twin(path=None):
+    df2 = read_dataset(["p", "n"], value_count=2, path=path)
 
     data = []  # tuples (p, third_n)
 
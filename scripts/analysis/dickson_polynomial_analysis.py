@@ -15,39 +15,40 @@ We substitute the three cardinality-2 index formulas:
     n3 = (p^2 + 2p - 1) / 2
 """
 
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dickson_eval import dickson_values, lucas_v
+from multiplicity_profiles import value_profile
+from value_set_cache import cached_value_set
+
 
 def dickson_polynomial_modp(n, x, p, a=1):
     """
-    Compute D_n(a, x) mod p using the recurrence relation.
+    Compute D_n(a, x) mod p.
+    Uses the doubling form of the recurrence relation, O(log n) steps.
     Returns an integer result mod p.
     """
-    if n == 0:
-        return 2 % p
-    elif n == 1:
-        return x % p
-    
-    # Use recurrence relation
-    D_prev2 = 2  # D_0
-    D_prev1 = x  # D_1
-    
-    for i in range(2, n + 1):
-        D_curr = (x * D_prev1 - a * D_prev2) % p
-        D_prev2 = D_prev1
-        D_prev1 = D_curr
-    
-    return D_prev1
+    return lucas_v(n, x, a, p)
 
 
 def compute_dickson_valueset(n, p, a=1):
     """
     Compute the value set of D_n(a, x) over F_p.
-    Returns a set of distinct values.
+    All x are evaluated at once, or the set comes from the shared value-set
+    cache when an earlier run computed it; returns a set of distinct values.
     """
-    values = set()
-    for x in range(p):
-        val = dickson_polynomial_modp(n, x, p, a)
-        values.add(val)
-    return values
+    return set(cached_value_set("dickson", n, p, a))
+
+
+def dickson_profile(n, p, a=1):
+    """
+    Preimage-size profile {m: count} of the D_n(a, x) analyzed by
+    compute_dickson_valueset(): for each multiplicity m, the number of
+    values taken by exactly m elements x of F_p.
+    """
+    return value_profile(dickson_values(n, p, a), p)
 
 
 def analyze_dickson_for_cardinality_2_indices():
@@ -150,6 +151,11 @@ def analyze_value_distribution():
         print(f"  n2 = {n2:4d}: D_{n2}(1,x) → {sorted(vs2)} (card={len(vs2)})")
         print(f"  n3 = {n3:4d}: D_{n3}(1,x) → {sorted(vs3)} (card={len(vs3)})")
 
+        # How often each value is hit, as {preimage size: number of values}
+        print("  Preimage sizes {m: values hit m times}:")
+        for label, n in (("n1", n1), ("n2", n2), ("n3", n3)):
+            print(f"    {label}: {dickson_profile(n, p_val)}")
+
 
 if __name__ == "__main__":
     analyze_dickson_for_cardinality_2_indices()
@@ -13,35 +13,41 @@ We substitute the three cardinality-2 index formulas:
     n1 = (p^2 + 1) / 2
     n2 = p^2 - 1
     n3 = (p^2 + 2p - 1) / 2
+
+The polynomials are built from their closed-form binomial coefficients
+(utilities/dickson_poly.py) and handed to sympy as a Poly at the end, so
+the special indices can be inspected for p in the hundreds; --mod-p builds
+them over GF(p) instead of ZZ.  --reduced prints instead the representative
+of degree < p modulo x^p - x, i.e. the polynomial function behind each
+value set, computed without forming the degree-n polynomial.
+
+Usage: python dickson_polynomial_formulas.py [--primes P ...] [--mod-p | --reduced]
 """
 
-import sympy as sp
-from sympy import symbols, simplify, expand, factor, Poly
+import argparse
+import os
+import sys
+
+import numpy as np
+from sympy import symbols, Poly
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dickson_eval import dickson_values, lucas_v
+from dickson_poly import dickson_coefficients, evaluate_all, reduced_dickson, reduced_reversed_dickson
 
-def dickson_polynomial_recurrence(n, x, a=1):
+
+def dickson_polynomial(n, x, a=1, modulus=None):
     """
-    Compute D_n(a, x) using the recurrence relation.
-    Returns a sympy expression.
+    D_n for the recurrence above as a sympy Poly in x, over ZZ or, with
+    modulus=p, over GF(p).  The coefficients are computed as integers first.
     """
-    if n == 0:
-        return 2
-    elif n == 1:
-        return x
-    
-    # Use recurrence relation
-    D_prev2 = 2  # D_0
-    D_prev1 = x  # D_1
-    
-    for i in range(2, n + 1):
-        D_curr = x * D_prev1 - a * D_prev2
-        D_prev2 = D_prev1
-        D_prev1 = D_curr
-    
-    return D_prev1
+    coeffs = dickson_coefficients(n, a, modulus)
+    if modulus is None:
+        return Poly(coeffs[::-1], x)
+    return Poly(coeffs[::-1], x, modulus=modulus)
 
 
-def analyze_dickson_for_cardinality_2_indices():
+def analyze_dickson_for_cardinality_2_indices(primes=(3, 5, 7, 11), mod_p=False):
     """
     For the three cardinality-2 index formulas, derive the explicit
     Dickson polynomial expressions in terms of p and x.
@@ -73,14 +79,13 @@ def analyze_dickson_for_cardinality_2_indices():
         # Let's compute for several small primes to see the pattern
         print("Computing D_n(1, x) for small primes to identify pattern:\n")
         
-        for p_val in [3, 5, 7, 11]:
+        for p_val in primes:
             n_val = int(n_expr.subs(p, p_val))
-            D_n = dickson_polynomial_recurrence(n_val, x, a=1)
-            D_n_simplified = simplify(expand(D_n))
-            
+            D_n = dickson_polynomial(n_val, x, a=1, modulus=p_val if mod_p else None)
+
             print(f"p = {p_val}: n = {n_val}")
-            print(f"  D_{n_val}(1, x) = {D_n_simplified}")
-            print(f"  Degree: {sp.degree(D_n_simplified, x)}")
+            print(f"  D_{n_val}(1, x) = {D_n.as_expr()}")
+            print(f"  Degree: {D_n.degree()}")
             print()
         
         results[name] = {
@@ -136,8 +141,7 @@ def verify_n2_formula():
     x = symbols('x')
     for p_val in [3, 5, 7]:
         n_val = p_val**2 - 1
-        D_n = dickson_polynomial_recurrence(n_val, x, a=1)
-        D_n_simplified = simplify(D_n)
+        D_n_simplified = dickson_polynomial(n_val, x, a=1).as_expr()
         print(f"\np = {p_val}: n = {n_val}")
         print(f"  D_{n_val}(1, x) = {D_n_simplified}")
         
@@ -148,21 +152,35 @@ def verify_n2_formula():
             print(f"  Note: Polynomial form (should evaluate to 2 mod p)")
 
 
+def reduced_forms(primes):
+    """
+    Print, for each cardinality-2 index, the reduced representatives of
+    D_n(x, 1) and of the reversed D_n(1, x) in GF(p)[x] / (x^p - x) together
+    with the value set they define on F_p.
+    """
+    x = symbols('x')
+    print("=" * 80)
+    print("REDUCED REPRESENTATIVES MODULO x^p - x")
+    print("=" * 80)
+    for p_val in primes:
+        print(f"\nPrime p = {p_val}")
+        indices = {
+            'n1 = (p^2+1)/2': (p_val**2 + 1) // 2,
+            'n2 = p^2-1': p_val**2 - 1,
+            'n3 = (p^2+2p-1)/2': (p_val**2 + 2*p_val - 1) // 2,
+        }
+        for label, n in indices.items():
+            print(f"  {label}: n = {n}")
+            for name, coeffs in (("D_n(x, 1)", reduced_dickson(n, p_val)),
+                                 ("D_n(1, x)", reduced_reversed_dickson(n, p_val))):
+                poly = Poly(coeffs[::-1].tolist(), x, modulus=p_val)
+                value_set = sorted(set(evaluate_all(coeffs, p_val).tolist()))
+                print(f"    {name} = {poly.as_expr()}  (mod x^{p_val} - x), value set {value_set}")
+
+
 def dickson_mod(n, x_val, p_mod):
-    """Compute D_n(1, x_val) modulo p_mod using the recurrence (numeric)."""
-    x_val = x_val % p_mod
-    if n == 0:
-        return 2 % p_mod
-    if n == 1:
-        return x_val
-
-    D_prev2 = 2 % p_mod
-    D_prev1 = x_val
-    for i in range(2, n + 1):
-        D_curr = (x_val * D_prev1 - D_prev2) % p_mod
-        D_prev2 = D_prev1
-        D_prev1 = D_curr
-    return D_prev1
+    """Compute D_n(1, x_val) modulo p_mod in O(log n) steps (numeric)."""
+    return lucas_v(n, x_val, 1, p_mod)
 
 
 def derive_and_verify_closed_forms(primes=[3,5,7,11]):
@@ -191,17 +209,13 @@ def derive_and_verify_closed_forms(primes=[3,5,7,11]):
         n3 = (p_val**2 + 2*p_val - 1) // 2
 
         def check_n(n, label):
-            values = [dickson_mod(n, xv, p_val) for xv in range(p_val)]
-            uniq = sorted(set(values))
+            values = dickson_values(n, p_val)
+            uniq = sorted(set(values.tolist()))
             print(f"  {label}: n={n}, distinct values in F_{p_val}: {uniq}")
 
             # Check whether each value equals ±x for all x
-            matches_pm = True
-            for xv in range(p_val):
-                val = dickson_mod(n, xv, p_val)
-                if not (val == xv % p_val or val == (-xv) % p_val):
-                    matches_pm = False
-                    break
+            xs = np.arange(p_val)
+            matches_pm = bool(np.all((values == xs) | (values == (-xs) % p_val)))
             if matches_pm:
                 print(f"    -> For every x in F_{p_val}, D_n(1,x) is either x or -x (so image size ≤ 2)")
             else:
@@ -218,9 +232,22 @@ def derive_and_verify_closed_forms(primes=[3,5,7,11]):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dickson polynomials at the cardinality-2 indices.")
+    parser.add_argument("--primes", nargs="+", type=int, default=[3, 5, 7, 11],
+                        help="primes to expand the polynomials for (default: 3 5 7 11)")
+    parser.add_argument("--mod-p", action="store_true",
+                        help="reduce the coefficients mod p, i.e. work in GF(p)[x]")
+    parser.add_argument("--reduced", action="store_true",
+                        help="only print the representatives of degree < p modulo x^p - x")
+    args = parser.parse_args()
+
+    if args.reduced:
+        reduced_forms(args.primes)
+        sys.exit(0)
+
     # Check if sympy is installed
     try:
-        results = analyze_dickson_for_cardinality_2_indices()
+        results = analyze_dickson_for_cardinality_2_indices(args.primes, args.mod_p)
         verify_n2_formula()
         
         print("\n" + "=" * 80)
@@ -1,53 +1,268 @@
-import math
-import pandas as pd
-
-# List odd primes up to 97
-primes = []
-for p in range(3, 98, 2):
-    isprime = True
-    for q in range(3, int(math.sqrt(p)) + 1, 2):
-        if p % q == 0:
-            isprime = False
-            break
-    if isprime:
-        primes.append(p)
-
-data = []
-for p in primes:
-    # Compute D_n(1, x) for x = 0..p-1 via recurrence in F_p
-    Dprev = [2] * p  # D_0(1, x) = 2
-    Dcurr = [1] * p  # D_1(1, x) = 1
-    # Record n = 0
-    vals = sorted(set(Dprev))
-    data.append((p, 0, len(vals), len(vals) == p, vals))
-    # Record n = 1
-    vals = sorted(set(Dcurr))
-    data.append((p, 1, len(vals), len(vals) == p, vals))
-    # For n >= 2
-    for n in range(2, p * p):
-        Dnext = []
-        for x in range(p):
-            Dnext_val = (Dcurr[x] - x * Dprev[x]) % p
-            Dnext.append(Dnext_val)
-        vals = sorted(set(Dnext))
-        data.append((p, n, len(vals), len(vals) == p, vals))
-        Dprev, Dcurr = Dcurr, Dnext
-
-# Build DataFrame and display it
-df = pd.DataFrame(data, columns=["p", "n", "value_count", "is_permutation", "values"])
-print("Reversed Dickson value sets (a = 1):")
-with pd.option_context("display.max_rows", None, "display.max_columns", None, "display.width", None):
-    print(df)
-
-# Save a CSV-friendly copy
-df_for_csv = df.copy()
-df_for_csv["values"] = df_for_csv["values"].apply(lambda lst: ",".join(str(v) for v in lst))
-df_for_csv.to_csv("../../data/reversed_dickson_values.csv", index=False)
-print('Saved results to "data/reversed_dickson_values.csv".')
-
-# Sort by cardinality (descending) then save a separate CSV
-df_sorted = df.sort_values(["value_count", "p", "n"], ascending=[False, True, True]).reset_index(drop=True)
-df_sorted_for_csv = df_sorted.copy()
-df_sorted_for_csv["values"] = df_sorted_for_csv["values"].apply(lambda lst: ",".join(str(v) for v in lst))
-df_sorted_for_csv.to_csv("../../data/reversed_dickson_values_by_cardinality.csv", index=False)
-print('Saved sorted results to "data/reversed_dickson_values_by_cardinality.csv".')
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from cardinality_matrix import A0_FILE, build_cardinality_matrix, load_cardinality_matrix
+from cardinality_search import search_small_value_sets
+from dataset import DATA_DIR, DEFAULT_CSV, DEFAULT_DATASET, DEFAULT_SORTED_CSV
+from dataset import ShardWriter, export_csv, read_manifest, remove_partial_shards, write_manifest, write_tables_csv
+from multi_a_engine import value_counts_a0
+from multiplicity_profiles import ProfileWriter
+from primes import odd_primes_up_to
+from reversed_dickson_engine import DEFAULT_BLOCK_ROWS, iter_table_blocks, scan_period, table_block
+from summary_stats import PrimeSummary, write_summary
+
+
+BLOCK_COLUMNS = ["n", "value_count", "is_permutation", "values", "multiplicity"]
+
+
+def iter_prime_blocks(p, n_stop=None, multiplicities=False):
+    """
+    Yield the reversed Dickson table of a single prime p block by block.
+
+    Each block is a dict of column arrays for consecutive n within
+    0..n_stop-1 (default p^2, at most p^2): n, value_count, is_permutation,
+    and values, the value sets as a (rows, ceil(p/64)) uint64 bitmask array.
+    With multiplicities=True it also holds "multiplicity", the block's
+    preimage-size profiles as (lengths, sizes, counts) CSR pieces.
+    """
+    # Compute D_n(1, x) for x = 0..p-1 and n = 0..n_stop-1 with the vectorized
+    # engine; value_count and is_permutation come straight from the arrays.
+    for columns in iter_table_blocks(p, n_stop, multiplicities=multiplicities):
+        yield dict(zip(BLOCK_COLUMNS, columns))
+
+
+def expand_prime_shard(p, n_stop, writer, append, profiles=None, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Fill n = 0..n_stop-1 (n_stop > p^2) from a single period of the recurrence.
+
+    D_{n+L}(1, x) = D_n(1, x) for n >= 1, so only the pass that finds L is
+    computed; its blocks go to append() as they are produced.  Every later
+    row is a copy of row 1 + (n - 1) mod L, read back block by block from
+    the shard's memory maps (writer) and profile files (profiles), so memory
+    stays bounded by one block.
+    """
+    written = 0
+
+    def visit(n_start, block):
+        nonlocal written
+        block = block[:n_stop - n_start]
+        if len(block):
+            append(dict(zip(BLOCK_COLUMNS, table_block(n_start, block, p, profiles is not None))))
+            written = n_start + len(block)
+
+    period, _ = scan_period(p, visit, block_rows)
+    for start in range(written, n_stop, block_rows):
+        n = np.arange(start, min(start + block_rows, n_stop), dtype=np.int64)
+        source = 1 + (n - 1) % period
+        block = writer.take(source)
+        block["n"] = n
+        if profiles is not None:
+            block["multiplicity"] = profiles.take(source)
+        append(block)
+
+
+def write_prime_shard(p, dataset_dir, n_stop=None, multiplicities=False):
+    """
+    Worker entry point: compute one prime and write its own shard of the
+    dataset, one engine block at a time.  The prime's summary statistics
+    (summary_stats.py) are accumulated from the same blocks and stored in
+    the shard, and so are the multiplicity profiles when requested.
+    """
+    rows = p * p if n_stop is None else n_stop
+    summary = PrimeSummary(p)
+    with ShardWriter(dataset_dir, p, rows) as writer:
+        profiles = ProfileWriter(writer.directory, rows) if multiplicities else None
+
+        def append(block):
+            writer.append(block)
+            summary.update(block["n"], block["value_count"])
+            if profiles is not None:
+                profiles.append(block["multiplicity"])
+
+        if n_stop is not None and n_stop > p * p:
+            expand_prime_shard(p, n_stop, writer, append, profiles)
+        else:
+            for block in iter_prime_blocks(p, n_stop, multiplicities):
+                append(block)
+        if profiles is not None:
+            profiles.close()
+        writer.save_json("summary", summary.to_dict())
+    return p
+
+
+def completed_primes(dataset_dir, n_stop=None):
+    """
+    Primes already in the dataset's manifest (empty if there is none).
+
+    Raises ValueError when the existing shards were computed for a different
+    --n-stop, since mixing index ranges would make the dataset inconsistent.
+    """
+    if not os.path.exists(os.path.join(dataset_dir, "manifest.json")):
+        return []
+    manifest = read_manifest(dataset_dir)
+    if manifest.get("n_stop") != n_stop:
+        raise ValueError(f"{dataset_dir} was generated with --n-stop {manifest.get('n_stop')}, "
+                         f"not {n_stop}; use a different --dataset-dir")
+    return manifest["primes"]
+
+
+def generate(primes, workers, dataset_dir, n_stop=None, extend=False, multiplicities=False):
+    """
+    Compute every prime into its own shard of the columnar dataset.
+
+    With more than one worker the primes run in a process pool.  The cost of
+    a prime grows like p^3, so primes are submitted largest first to keep a
+    big prime from starting last and leaving one worker straggling.  Shards
+    are independent files and readers visit them in ascending prime order, so
+    the result does not depend on scheduling.
+
+    The manifest is rewritten after every finished shard.  With extend=True
+    the primes it already lists are kept and skipped, so a longer --max-prime
+    only computes the new primes and an interrupted run resumes where it
+    stopped.  multiplicities=True also stores each computed shard's
+    preimage-size profiles (kept primes are not recomputed).
+    """
+    os.makedirs(dataset_dir, exist_ok=True)
+    remove_partial_shards(dataset_dir)
+    done = completed_primes(dataset_dir, n_stop) if extend else []
+    todo = sorted(set(primes) - set(done))
+    if done:
+        print(f"{len(done)} primes already in the dataset, computing {len(todo)} more.")
+    write_manifest(dataset_dir, done, n_stop)
+
+    def finished(p):
+        done.append(p)
+        write_manifest(dataset_dir, done, n_stop)
+
+    if workers > 1:
+        print(f"Computing {len(todo)} primes with {workers} workers (largest first)...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(write_prime_shard, p, dataset_dir, n_stop, multiplicities)
+                       for p in sorted(todo, reverse=True)]
+            # Record every shard that finishes, even after another one failed,
+            # so --extend does not recompute it; the first error is raised at the end
+            error = None
+            for future in as_completed(futures):
+                try:
+                    p = future.result()
+                except Exception as exc:
+                    error = error or exc
+                    continue
+                finished(p)
+                print(f"  p = {p} done")
+            if error is not None:
+                raise error
+    else:
+        for p in todo:
+            finished(write_prime_shard(p, dataset_dir, n_stop, multiplicities))
+    print(f'Saved columnar dataset to "{dataset_dir}".')
+
+    # Histograms, extremes and the small-cardinality indices of every prime
+    write_summary(dataset_dir)
+    print("Saved summary statistics.")
+
+    # uint16 value_count rows of every prime in one memory-mappable file
+    if max(done, default=0) <= np.iinfo(np.uint16).max:
+        build_cardinality_matrix(dataset_dir)
+        print("Saved cardinality matrix.")
+
+
+def search(primes, max_cardinality, workers, n_stop=None):
+    """
+    Find only the indices with value_count <= max_cardinality, with the
+    early-exit search of cardinality_search.py, and save them as a CSV.
+    """
+    name = f"reversed_dickson_values_cardinality_le{max_cardinality}.csv"
+    args = [(p, max_cardinality, n_stop) for p in primes]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            tables = list(pool.map(search_small_value_sets, *zip(*args)))
+    else:
+        tables = [search_small_value_sets(*a) for a in args]
+    for p, table in zip(primes, tables):
+        print(f"  p = {p}: {len(table['n'])} indices with value_count <= {max_cardinality}")
+    target = os.path.join(DATA_DIR, name)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    write_tables_csv(target, zip(primes, tables))
+    print(f'Saved search results to "{target}".')
+
+
+def write_counts_by_a(dataset_dir):
+    """
+    Save value_count of D_n(0, x) as cardinality_a0.npy, laid out like the
+    cardinality matrix, so CardinalityMatrix.row_for_a(p, a) serves every a.
+
+    Nothing else is stored: for a != 0 the counts equal the a = 1 row of the
+    matrix, and a = 0 has a closed form (see multi_a_engine.py).
+    """
+    if max(read_manifest(dataset_dir)["primes"], default=0) > np.iinfo(np.uint16).max:
+        print("Skipped --all-a: the cardinality matrix only covers primes up to 65535.")
+        return
+    # Opens the matrix, building it first when it is missing or stale
+    matrix = load_cardinality_matrix(dataset_dir)
+    target = os.path.join(dataset_dir, A0_FILE)
+    # np.save-style temporary name, renamed into place when complete
+    tmp = os.path.join(dataset_dir, "tmp_" + A0_FILE)
+    counts = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.uint16, shape=matrix.counts.shape)
+    for p in matrix.primes:
+        start, rows = matrix.offsets[p]
+        counts[start:start + rows] = value_counts_a0(np.arange(rows), p)
+    counts.flush()
+    del counts
+    os.replace(tmp, target)
+    print(f'Saved value_count for a = 0 to "{target}".')
+
+
+def write_csv(dataset_dir):
+    """Stream the legacy CSV files out of the columnar dataset."""
+    # The by-cardinality file is an external merge of per-prime sorted runs,
+    # so neither file needs the whole table in memory.
+    export_csv(dataset_dir, DEFAULT_CSV, DEFAULT_SORTED_CSV)
+    print(f'Saved results to "{DEFAULT_CSV}".')
+    print(f'Saved sorted results to "{DEFAULT_SORTED_CSV}".')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate reversed Dickson value sets D_n(1, x) over F_p.")
+    parser.add_argument("--max-prime", type=int, default=97, help="largest prime to include (default: 97)")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument("--dataset-dir", default=DEFAULT_DATASET,
+                        help="columnar dataset directory (default: data/reversed_dickson_values in the repository)")
+    parser.add_argument("--csv", action="store_true",
+                        help="also write the legacy reversed_dickson_values*.csv files")
+    parser.add_argument("--extend", action="store_true",
+                        help="keep the primes already listed in the dataset manifest and only compute "
+                             "the missing ones (also resumes an interrupted run)")
+    parser.add_argument("--all-a", action="store_true",
+                        help="also save value_count of D_n(0, x) (cardinality_a0.npy inside the dataset "
+                             "directory); with the matrix's a = 1 row it covers every a in F_p")
+    parser.add_argument("--multiplicities", action="store_true",
+                        help="also store the preimage-size profile of every (p, n), how many values "
+                             "D_n(1, x) takes exactly m times, next to each shard's columns")
+    parser.add_argument("--max-cardinality", type=int, default=None, metavar="K",
+                        help="only search for the indices with value_count <= K (early exit per index) "
+                             "and save them to data/reversed_dickson_values_cardinality_leK.csv")
+    parser.add_argument("--n-stop", type=int, default=None,
+                        help="compute indices n = 0..N-1 for every prime (default: p^2); beyond p^2 "
+                             "one period of the recurrence is computed and repeated")
+    args = parser.parse_args()
+
+    primes = odd_primes_up_to(args.max_prime).tolist()
+    if args.max_cardinality is not None:
+        search(primes, args.max_cardinality, args.workers, args.n_stop)
+        return
+    generate(primes, args.workers, args.dataset_dir, args.n_stop, args.extend, args.multiplicities)
+
+    if args.all_a:
+        write_counts_by_a(args.dataset_dir)
+    if args.csv:
+        write_csv(args.dataset_dir)
+
+
+if __name__ == "__main__":
+    main()
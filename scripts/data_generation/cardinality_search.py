@@ -0,0 +1,159 @@
+"""
+Early-exit search for the indices n whose value set of D_n(1, x) is small.
+
+Building a full value set costs p evaluations per index, but deciding
+"|V_n| <= k" usually needs only a handful: as soon as k + 1 distinct values
+have appeared the index is rejected.  The search therefore evaluates x
+column by column for a whole block of candidate indices at once, keeps per
+index the at most k distinct values seen so far, and drops every index that
+exceeds k.  For k = 2 almost every index is rejected within the first
+handful of x values, so the search runs in two phases:
+
+  1. the first PREFIX_COLUMNS values of x on every candidate, each costing
+     two table lookups per index (the split/inert structure of
+     cardinality_engine.py, tables built once per prime);
+  2. the remaining x values on the few survivors only, evaluated directly
+     with lucas_v() over an array of indices.
+
+The survivors after all p columns are exactly the indices with
+value_count <= k, and their stored values are their value sets.
+
+Usage: python cardinality_search.py [--max-prime P] [-k K]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dickson_eval import lucas_v
+from fp2 import sqrt_table
+from primes import odd_primes_up_to
+from value_set_masks import pack_presence
+
+# Candidate indices per block, the x prefix filtered with lookup tables, and
+# the largest (survivors x columns) chunk evaluated at once afterwards.
+DEFAULT_BLOCK_ROWS = 1 << 16
+PREFIX_COLUMNS = 32
+MAX_CHUNK_CELLS = 1 << 20
+
+
+def _power_table(xs, exponents, p):
+    """table[e, i] = xs[i]^exponents[e] mod p, one square-and-multiply ladder for all cells."""
+    result = np.ones((len(exponents), len(xs)), dtype=np.int64)
+    base = np.broadcast_to(xs % p, result.shape).copy()
+    exponents = exponents[:, None]
+    for shift in range(int(exponents.max(initial=0)).bit_length()):
+        bit = ((exponents >> shift) & 1).astype(bool)
+        result = np.where(bit, result * base % p, result)
+        base = base * base % p
+    return result
+
+
+def column_tables(p, xs):
+    """
+    Lookup tables giving D_n(1, x) for every n at each x in xs.
+
+    With roots alpha, beta of t^2 - t + x (see cardinality_engine.py):
+      split x: D_n = D_j with j = 1 + (n - 1) mod (p - 1) for n >= 1;
+      inert x: D_n = x^q * D_r with q = n // (p + 1) mod (p - 1), r = n mod (p + 1).
+    Returns (split, base, powers): split[i] tells which case applies to
+    xs[i], base[e, i] = D_e(1, xs[i]) for e = 0..p and powers[q, i] = xs[i]^q.
+    """
+    split = sqrt_table(p)[(1 - 4 * xs) % p] >= 0
+    base = lucas_v(np.arange(p + 1, dtype=np.int64)[:, None], 1, xs[None, :], p)
+    powers = _power_table(xs, np.arange(p - 1, dtype=np.int64), p)
+    return split, base, powers
+
+
+def _absorb(column, columns, seen, count, k):
+    """
+    Add the values of columns 0..columns-1 to each row's distinct values,
+    dropping a row as soon as it has more than k.
+
+    column(i, rows) returns column i for the given rows of the input.
+    Returns (rows, seen, count) for the surviving rows.
+    """
+    rows = np.arange(len(count))
+    for i in range(columns):
+        if not len(rows):
+            break
+        v = column(i, rows)
+        new = ~(seen == v[:, None]).any(axis=1)
+        keep = ~(new & (count == k))
+        add = new & keep
+        seen[np.flatnonzero(add), count[add]] = v[add]
+        count = count + add
+        if not keep.all():
+            rows, seen, count = rows[keep], seen[keep], count[keep]
+    return rows, seen, count
+
+
+def search_small_value_sets(p, k, n_stop=None, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Find every n in [0, n_stop) (default p^2) with |{D_n(1, x) : x in F_p}| <= k.
+
+    Returns a dict of column arrays in ascending n: n, value_count,
+    is_permutation and values (bit-packed masks, as in Test.py's tables).
+    """
+    if n_stop is None:
+        n_stop = p * p
+    prefix = min(p, PREFIX_COLUMNS)
+    split, base, powers = column_tables(p, np.arange(prefix, dtype=np.int64))
+
+    # Phase 1: the first x values, two table lookups per candidate and column
+    found_n, found_count, found_seen = [], [], []
+    for start in range(0, n_stop, block_rows):
+        n = np.arange(start, min(start + block_rows, n_stop), dtype=np.int64)
+        j = np.where(n == 0, 0, (n - 1) % (p - 1) + 1)
+        q = n // (p + 1) % (p - 1)
+        r = n % (p + 1)
+
+        def column(i, rows):
+            if split[i]:
+                return base[j[rows], i]
+            return powers[q[rows], i] * base[r[rows], i] % p
+
+        seen = np.full((len(n), k), -1, dtype=np.int64)
+        rows, seen, count = _absorb(column, prefix, seen, np.zeros(len(n), dtype=np.int64), k)
+        found_n.append(n[rows])
+        found_count.append(count)
+        found_seen.append(seen)
+    n = np.concatenate(found_n)
+    count = np.concatenate(found_count)
+    seen = np.concatenate(found_seen)
+
+    # Phase 2: the remaining x values on the survivors only, evaluated directly
+    x = prefix
+    while x < p and len(n):
+        width = max(1, min(p - x, MAX_CHUNK_CELLS // len(n)))
+        values = lucas_v(n[:, None], 1, np.arange(x, x + width, dtype=np.int64)[None, :], p)
+        rows, seen, count = _absorb(lambda i, rows: values[rows, i], width, seen, count, k)
+        n = n[rows]
+        x += width
+
+    presence = np.zeros((len(n), p + 1), dtype=bool)  # column p absorbs the -1 padding
+    presence[np.arange(len(n))[:, None], seen] = True
+    return {
+        "n": n,
+        "value_count": count.astype(np.int32),
+        "is_permutation": count == p,
+        "values": pack_presence(presence[:, :p]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indices n whose value set of D_n(1, x) has at most k elements.")
+    parser.add_argument("--max-prime", type=int, default=31, help="largest prime to include (default: 31)")
+    parser.add_argument("-k", type=int, default=2, help="largest value_count to report (default: 2)")
+    args = parser.parse_args()
+
+    for p in odd_primes_up_to(args.max_prime).tolist():
+        table = search_small_value_sets(p, args.k)
+        print(f"p = {p}: {len(table['n'])} indices with value_count <= {args.k}: {table['n'].tolist()}")
+
+
+if __name__ == "__main__":
+    main()
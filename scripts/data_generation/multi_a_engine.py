@@ -0,0 +1,161 @@
+"""
+Reversed Dickson value sets D_n(a, x) over F_p for every parameter a.
+
+The roots of t^2 - a t + x are a times the roots of t^2 - t + x / a^2, so
+for a != 0
+
+    D_n(a, x) = a^n * D_n(1, x / a^2).
+
+x -> x / a^2 permutes F_p, hence the value set of D_n(a, .) is the value
+set of D_n(1, .) multiplied by a^n: it has the same value_count for every
+a != 0, and it is obtained from the a = 1 set by relabelling the values.
+For a = 0 the recurrence collapses to D_n(0, x) = -x * D_{n-2}(0, x):
+
+    D_n(0, x) = 0                 for odd n,
+    D_n(0, x) = 2 * (-x)^m        for n = 2m,
+
+with value_count 1 for n = 0 and odd n, and 1 + (p - 1) / gcd(m, p - 1)
+for n = 2m >= 2.
+
+So the engine runs the a = 1 recurrence once and derives the other p - 1
+parameters from each of its blocks, instead of rerunning the pipeline per
+a.  iter_value_blocks_2d() is the direct 2-D recurrence over all (a, x) at
+once and serves as the brute-force cross-check (--check).
+
+Usage: python multi_a_engine.py [--max-prime P] [--check]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dickson_eval import lucas_v
+from primes import odd_primes_up_to
+from reversed_dickson_engine import DEFAULT_BLOCK_ROWS, distinct_counts, iter_table_blocks, presence_matrix
+from value_set_masks import pack_presence, unpack_masks
+
+# Cells (rows * p * p) per block of the 2-D recurrence
+CELLS_2D = 1 << 22
+
+
+def value_counts_a0(n, p):
+    """value_count of D_n(0, x) over F_p for an array of indices n (closed form)."""
+    n = np.asarray(n, dtype=np.int64)
+    m = n // 2
+    counts = 1 + (p - 1) // np.gcd(m, p - 1)
+    return np.where((n % 2 == 1) | (n == 0), 1, counts)
+
+
+def value_counts_by_a(counts_a1, p):
+    """
+    value_count for every (a, n) as a (p, len(counts_a1)) array, given the
+    a = 1 counts for n = 0, 1, ...; row a is the parameter a.
+    """
+    counts_a1 = np.asarray(counts_a1)
+    table = np.empty((p, len(counts_a1)), dtype=counts_a1.dtype)
+    table[1:] = counts_a1
+    table[0] = value_counts_a0(np.arange(len(counts_a1)), p)
+    return table
+
+
+def scale_masks(masks, n, a, p):
+    """Value sets of D_n(a, .) from the bit-packed value sets of D_n(1, .), for a != 0."""
+    presence = unpack_masks(masks, p)
+    multipliers = np.array([pow(a, int(k), p) for k in n], dtype=np.int64)
+    targets = multipliers[:, None] * np.arange(p, dtype=np.int64)[None, :] % p
+    scaled = np.zeros_like(presence)
+    scaled[np.arange(len(n))[:, None], targets] = presence
+    return pack_presence(scaled)
+
+
+def iter_all_a_blocks(p, n_stop=None, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Yield (a, n, value_count, is_permutation, masks) for every a in F_p and
+    consecutive blocks of n in [0, n_stop) (default p^2).
+
+    Each block of the a = 1 recurrence is computed once and reused for all
+    a: a != 0 by scaling its value sets, a = 0 from the closed form.
+    """
+    x = np.arange(p, dtype=np.int64)
+    for n, value_count, is_permutation, masks in iter_table_blocks(p, n_stop, block_rows):
+        zero = lucas_v(n[:, None], 0, x[None, :], p)
+        presence = presence_matrix(zero, p)
+        zero_count = presence.sum(axis=1)
+        yield 0, n, zero_count, zero_count == p, pack_presence(presence)
+        yield 1, n, value_count, is_permutation, masks
+        for a in range(2, p):
+            yield a, n, value_count, is_permutation, scale_masks(masks, n, a, p)
+
+
+def iter_value_blocks_2d(p, n_stop=None, block_rows=None):
+    """
+    Yield (n_start, block) with block[i, a, x] = D_{n_start + i}(a, x) mod p,
+    from the recurrence D_n = a * D_{n-1} - x * D_{n-2} run on the whole
+    (a, x) grid at once.  O(p^2) work per index; used for cross-checks.
+    """
+    if n_stop is None:
+        n_stop = p * p
+    if block_rows is None:
+        block_rows = max(1, CELLS_2D // (p * p))
+    a = np.arange(p, dtype=np.int64)[:, None]
+    x = np.arange(p, dtype=np.int64)[None, :]
+    d_prev = np.full((p, p), 2 % p, dtype=np.int64)
+    d_curr = np.broadcast_to(a, (p, p)).copy()
+
+    n = 0
+    while n < n_stop:
+        rows = min(block_rows, n_stop - n)
+        block = np.empty((rows, p, p), dtype=np.int64)
+        for i in range(rows):
+            if n + i == 0:
+                block[i] = d_prev
+            elif n + i == 1:
+                block[i] = d_curr
+            else:
+                block[i] = (a * d_curr - x * d_prev) % p
+                d_prev, d_curr = d_curr, block[i]
+        yield n, block
+        n += rows
+
+
+def check_against_2d(p, n_stop=None):
+    """Return True when iter_all_a_blocks() matches the direct 2-D recurrence exactly."""
+    expected_counts, expected_masks = [], []
+    for _, block in iter_value_blocks_2d(p, n_stop):
+        rows = block.shape[0]
+        flat = block.reshape(rows * p, p)
+        expected_counts.append(distinct_counts(flat, p).reshape(rows, p))
+        expected_masks.append(pack_presence(presence_matrix(flat, p)).reshape(rows, p, -1))
+    expected_counts = np.concatenate(expected_counts)
+    expected_masks = np.concatenate(expected_masks)
+
+    for a, n, value_count, _, masks in iter_all_a_blocks(p, n_stop):
+        if not (np.array_equal(value_count, expected_counts[n, a]) and np.array_equal(masks, expected_masks[n, a])):
+            return False
+    counts_a1 = expected_counts[:, 1]
+    return bool(np.array_equal(value_counts_by_a(counts_a1, p), expected_counts.T))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Value-set cardinality of D_n(a, x) over F_p for every a.")
+    parser.add_argument("--max-prime", type=int, default=13, help="largest prime to include (default: 13)")
+    parser.add_argument("--check", action="store_true",
+                        help="cross-check every prime against the 2-D (a, x) recurrence")
+    args = parser.parse_args()
+
+    for p in odd_primes_up_to(args.max_prime).tolist():
+        counts_a1 = np.concatenate([value_count for _, value_count, _, _ in iter_table_blocks(p)])
+        table = value_counts_by_a(counts_a1, p)
+        permutations = (table == p).sum(axis=1)
+        line = (f"p = {p}: value_count is the same for all a != 0; "
+                f"a = 0 has {int(permutations[0])} permutation indices, a != 0 has {int(permutations[1])}")
+        if args.check:
+            line += "  [exact]" if check_against_2d(p) else "  [MISMATCH]"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Vectorized NumPy engine for the reversed Dickson table.
+
+The pure-Python generator advances the recurrence
+
+    D_0(1, x) = 2
+    D_1(1, x) = 1
+    D_n(1, x) = D_{n-1}(1, x) - x * D_{n-2}(1, x)   (mod p)
+
+one x at a time, which costs O(p^3) interpreted operations per prime.  This
+module advances the recurrence for all x in F_p at once as int64 arrays and
+derives the value set statistics directly from those arrays, so no Python
+set or sorted list is built per index n.
+
+Rows are produced in blocks: block[i, x] = D_{n_start + i}(1, x) mod p.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from multiplicity_profiles import block_multiplicities, block_profiles
+from value_set_masks import pack_presence
+
+# Number of indices n held in memory at once.  A block costs
+# block_rows * p * 8 bytes for the values plus block_rows * p bytes for the
+# presence matrix.
+DEFAULT_BLOCK_ROWS = 1024
+
+
+def iter_value_blocks(p, n_stop=None, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Yield (n_start, block) for n = 0, 1, ..., n_stop - 1.
+
+    block is an int64 array of shape (rows, p) with block[i, x] equal to
+    D_{n_start + i}(1, x) mod p.  n_stop defaults to p^2, the range used by
+    the original generator.
+    """
+    if n_stop is None:
+        n_stop = p * p
+
+    x = np.arange(p, dtype=np.int64)
+    d_prev = np.full(p, 2 % p, dtype=np.int64)  # D_0(1, x) = 2
+    d_curr = np.full(p, 1 % p, dtype=np.int64)  # D_1(1, x) = 1
+    tmp = np.empty(p, dtype=np.int64)
+
+    n = 0
+    while n < n_stop:
+        rows = min(block_rows, n_stop - n)
+        block = np.empty((rows, p), dtype=np.int64)
+        for i in range(rows):
+            if n + i == 0:
+                block[i] = d_prev
+            elif n + i == 1:
+                block[i] = d_curr
+            else:
+                # D_n = D_{n-1} - x * D_{n-2}, written straight into the block
+                np.multiply(x, d_prev, out=tmp)
+                np.subtract(d_curr, tmp, out=block[i])
+                np.mod(block[i], p, out=block[i])
+                d_prev, d_curr = d_curr, block[i]
+        yield n, block
+        n += rows
+
+
+def presence_matrix(block, p):
+    """
+    Return a bool array of shape (rows, p) marking which values occur in
+    each row of block.  Entry [i, v] is True iff v is in the value set of row i.
+    """
+    rows = block.shape[0]
+    seen = np.zeros(rows * p, dtype=bool)
+    offsets = np.arange(rows, dtype=np.int64)[:, None] * p
+    seen[(block + offsets).ravel()] = True
+    return seen.reshape(rows, p)
+
+
+def distinct_counts(block, p):
+    """Number of distinct values in each row of block (values lie in [0, p))."""
+    return presence_matrix(block, p).sum(axis=1)
+
+
+def table_block(n_start, block, p, multiplicities=False):
+    """
+    Columns (n, value_count, is_permutation, masks) of one value block, plus
+    the preimage-size profiles when multiplicities is True.
+    """
+    if multiplicities:
+        # The preimage sizes give the presence matrix for free
+        multiplicity = block_multiplicities(block, p)
+        presence = multiplicity > 0
+    else:
+        presence = presence_matrix(block, p)
+    value_count = presence.sum(axis=1)
+    n = np.arange(n_start, n_start + block.shape[0], dtype=np.int64)
+    if multiplicities:
+        return n, value_count, value_count == p, pack_presence(presence), block_profiles(block, p, multiplicity)
+    return n, value_count, value_count == p, pack_presence(presence)
+
+
+def iter_table_blocks(p, n_stop=None, block_rows=DEFAULT_BLOCK_ROWS, multiplicities=False):
+    """
+    Yield (n, value_count, is_permutation, masks) for consecutive blocks.
+
+    n, value_count and is_permutation are 1-D arrays with one entry per index;
+    masks is the (rows, ceil(p/64)) uint64 array of bit-packed value sets
+    (see utilities/value_set_masks.py).  With multiplicities=True each tuple
+    also carries the block's preimage-size profiles as CSR pieces (see
+    utilities/multiplicity_profiles.py).
+    """
+    for n_start, block in iter_value_blocks(p, n_stop, block_rows):
+        yield table_block(n_start, block, p, multiplicities)
+
+
+def scan_period(p, visit, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Run the recurrence until the state (D_1, D_2) recurs and return
+    (period, x_periods) as described in detect_period().
+
+    visit(n_start, block) is called on every block computed on the way, so
+    it sees D_n for n = 0, 1, ... at least up to n = L; callers keep the
+    rows n <= L.  block_rows is raised to 4, since the first block must hold
+    the reference state and a row after it.
+    """
+    block_rows = max(block_rows, 4)
+    x_periods = np.zeros(p, dtype=np.int64)
+    ref_prev = ref_curr = prev_row = None
+
+    # The joint period divides p^2 - 1, so D_{p^2 + 1} closes the first cycle.
+    for n_start, block in iter_value_blocks(p, p * p + 2, block_rows):
+        visit(n_start, block)
+        if n_start == 0:
+            ref_prev, ref_curr = block[1].copy(), block[2].copy()
+            prev_row = block[2]
+            block, n_start = block[3:], 3
+
+        # Row i holds D_n for n = n_start + i, whose predecessor is row i - 1.
+        prev = np.vstack([prev_row[None, :], block[:-1]])
+        returned = (prev == ref_prev) & (block == ref_curr)
+        steps = np.arange(n_start, n_start + block.shape[0], dtype=np.int64) - 2
+
+        first_hit = returned.argmax(axis=0)
+        newly = (x_periods == 0) & returned.any(axis=0)
+        x_periods[newly] = steps[first_hit[newly]]
+
+        joint = np.flatnonzero(returned.all(axis=1))
+        if joint.size:
+            # The state returned at n = L + 2
+            return int(steps[joint[0]]), x_periods
+
+        prev_row = block[-1]
+
+    raise RuntimeError(f"no period found for p = {p}")
+
+
+def detect_period(p, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Detect the period of D_n(1, x) mod p in n, per x and jointly.
+
+    The state (D_{n-1}, D_n) evolves under a fixed linear map on a finite
+    set, so the sequence is eventually periodic.  For x != 0 the map is
+    invertible and the sequence is purely periodic; for x = 0 it is constant
+    1 from n = 1 on.  Hence D_{n + L}(1, x) = D_n(1, x) for all n >= 1, and the
+    period is found by waiting for the state (D_1, D_2) to recur.
+
+    Only one period is ever computed.  Returns (period, x_periods, counts):
+      period    -- joint period L over all x (the lcm of x_periods)
+      x_periods -- int64 array, x_periods[x] is the period for that x alone
+      counts    -- value_count for n = 0, 1, ..., L; see expand_value_counts()
+    """
+    counts = []
+    period, x_periods = scan_period(p, lambda n_start, block: counts.extend(distinct_counts(block, p).tolist()),
+                                    block_rows)
+    return period, x_periods, np.array(counts[:period + 1], dtype=np.int64)
+
+
+def expand_value_counts(counts, period, n):
+    """
+    value_count at index n (an int or an integer array) from one period.
+
+    counts and period come from detect_period(); the cost is independent of
+    how large n is.
+    """
+    n = np.asarray(n, dtype=np.int64)
+    return np.where(n == 0, counts[0], counts[1 + (n - 1) % period])
@@ -0,0 +1,159 @@
+"""
+Ragged value_count matrix of the reversed Dickson dataset.
+
+Row p holds value_count for n = 0, 1, ..., rows_p - 1 (rows_p = p^2 by
+default) as uint16, and all rows are stored back to back in one file next
+to the columnar dataset:
+
+    data/reversed_dickson_values/cardinality_matrix.npy    uint16, every row concatenated
+    data/reversed_dickson_values/cardinality_offsets.npy   int64 (primes, 3): p, start, rows
+    data/reversed_dickson_values/cardinality_a0.npy        uint16, D_n(0, x) rows (Test.py --all-a)
+
+The matrix is opened memory-mapped, so matrix[p, a:b] is a zero-copy view
+and matrix[p, ns] touches only the pages holding ns; nothing is loaded up
+front, however large the file.  Test.py writes the matrix after every run;
+load_cardinality_matrix() rebuilds it when the dataset has changed since.
+
+The matrix holds the parameter a = 1 of D_n(a, x).  Every a != 0 has the same
+value_count (see multi_a_engine.py), so only a = 0 is stored besides it, in
+the same layout; matrix.row_for_a(p, a) serves any a.
+"""
+
+import os
+
+import numpy as np
+
+from dataset import DEFAULT_CSV, DEFAULT_DATASET, read_dataset, read_manifest, read_prime_columns
+
+MATRIX_FILE = "cardinality_matrix.npy"
+OFFSETS_FILE = "cardinality_offsets.npy"
+A0_FILE = "cardinality_a0.npy"
+
+# Rows are copied into the matrix file this many entries at a time
+COPY_CHUNK = 1 << 22
+
+
+def build_cardinality_matrix(path=DEFAULT_DATASET):
+    """
+    Write cardinality_matrix.npy and cardinality_offsets.npy for the binary
+    dataset at path, streaming each shard's value_count column in chunks.
+    Both files are written under a temporary name and renamed into place.
+    """
+    primes = read_manifest(path)["primes"]
+    if primes and max(primes) > np.iinfo(np.uint16).max:
+        raise ValueError("value_count no longer fits in uint16 for p > 65535")
+    columns = [read_prime_columns(path, p, ["value_count"])["value_count"] for p in primes]
+    rows = np.array([len(c) for c in columns], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(rows)[:-1]]).astype(np.int64)
+    offsets = np.stack([np.asarray(primes, dtype=np.int64), starts, rows], axis=1) if primes else \
+        np.zeros((0, 3), dtype=np.int64)
+
+    matrix_tmp = os.path.join(path, MATRIX_FILE + ".tmp")
+    matrix = np.lib.format.open_memmap(matrix_tmp, mode="w+", dtype=np.uint16, shape=(int(rows.sum()),))
+    for column, start in zip(columns, starts):
+        for i in range(0, len(column), COPY_CHUNK):
+            chunk = column[i:i + COPY_CHUNK]
+            matrix[start + i:start + i + len(chunk)] = chunk
+    matrix.flush()
+    del matrix
+
+    # np.save appends .npy to names without it, so save under a .npy temporary name
+    offsets_tmp = os.path.join(path, "tmp_" + OFFSETS_FILE)
+    np.save(offsets_tmp, offsets)
+    os.replace(matrix_tmp, os.path.join(path, MATRIX_FILE))
+    os.replace(offsets_tmp, os.path.join(path, OFFSETS_FILE))
+
+
+class CardinalityMatrix:
+    """
+    value_count by (p, n) over a ragged uint16 matrix.
+
+        matrix = load_cardinality_matrix()
+        matrix.row(97)              # value_count for n = 0..97^2-1, a view
+        matrix[97, 4704:4710]       # a range, also a view
+        matrix[97, [4705, 9408]]    # arbitrary indices
+    """
+
+    def __init__(self, counts, offsets, counts_a0=None):
+        self.counts = counts
+        self.counts_a0 = counts_a0
+        self.offsets = {int(p): (int(start), int(rows)) for p, start, rows in offsets}
+        self.primes = sorted(self.offsets)
+
+    @classmethod
+    def open(cls, path=DEFAULT_DATASET):
+        """Memory-map the matrix files of the binary dataset at path."""
+        counts = np.load(os.path.join(path, MATRIX_FILE), mmap_mode="r")
+        a0_path = os.path.join(path, A0_FILE)
+        counts_a0 = np.load(a0_path, mmap_mode="r") if os.path.exists(a0_path) else None
+        if counts_a0 is not None and counts_a0.shape != counts.shape:
+            counts_a0 = None  # written for an older matrix
+        return cls(counts, np.load(os.path.join(path, OFFSETS_FILE)), counts_a0)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Build an in-memory matrix from a DataFrame with p, n and value_count columns."""
+        offsets, rows_per_prime = [], []
+        start = 0
+        for p, group in df.groupby("p", sort=True):
+            row = np.zeros(int(group["n"].max()) + 1, dtype=np.uint16)
+            row[group["n"].to_numpy()] = group["value_count"].to_numpy()
+            offsets.append((p, start, len(row)))
+            rows_per_prime.append(row)
+            start += len(row)
+        counts = np.concatenate(rows_per_prime) if rows_per_prime else np.zeros(0, dtype=np.uint16)
+        return cls(counts, offsets)
+
+    def __contains__(self, p):
+        return p in self.offsets
+
+    def rows(self, p):
+        """Number of indices n stored for prime p."""
+        return self.offsets[p][1]
+
+    def row(self, p):
+        """value_count of prime p for every stored n (a view into the matrix)."""
+        start, rows = self.offsets[p]
+        return self.counts[start:start + rows]
+
+    def row_for_a(self, p, a):
+        """
+        value_count of D_n(a, x) over F_p for every stored n.  a != 0 is the
+        a = 1 row; a = 0 needs the cardinality_a0.npy written by Test.py --all-a
+        (FileNotFoundError otherwise).
+        """
+        if a % p:
+            return self.row(p)
+        if self.counts_a0 is None:
+            raise FileNotFoundError(f"no {A0_FILE} for this matrix; run Test.py --all-a")
+        start, rows = self.offsets[p]
+        return self.counts_a0[start:start + rows]
+
+    def __getitem__(self, key):
+        p, n = key
+        return self.row(p)[n]
+
+
+def _is_current(path):
+    offsets_path = os.path.join(path, OFFSETS_FILE)
+    if not os.path.exists(offsets_path) or not os.path.exists(os.path.join(path, MATRIX_FILE)):
+        return False
+    return np.load(offsets_path)[:, 0].tolist() == read_manifest(path)["primes"]
+
+
+def load_cardinality_matrix(path=None):
+    """
+    Open the cardinality matrix of the dataset at path (default: the binary
+    dataset when present, else the legacy CSV).
+
+    For a binary dataset the matrix files are (re)built first when missing or
+    older than the manifest; for a CSV the matrix is built in memory.
+    Raises FileNotFoundError when no dataset exists.
+    """
+    if path is None:
+        path = DEFAULT_DATASET if os.path.isdir(DEFAULT_DATASET) else DEFAULT_CSV
+    if os.path.isdir(path):
+        if not _is_current(path):
+            build_cardinality_matrix(path)
+        return CardinalityMatrix.open(path)
+    return CardinalityMatrix.from_dataframe(read_dataset(["p", "n", "value_count"], path=path))
@@ -0,0 +1,442 @@
+"""
+Columnar binary format for the reversed Dickson dataset.
+
+The dataset is a directory with one sub-directory per prime and one .npy
+file per column:
+
+    data/reversed_dickson_values/
+        manifest.json               format version and the primes present
+        p00097/n.npy                int64,  one entry per index n
+        p00097/value_count.npy      int32
+        p00097/is_permutation.npy   bool
+        p00097/values.npy           uint64 (rows, ceil(p/64)) bit-packed value sets
+        p00097/rows_by_count.npy    int64,  row ids sorted by (value_count, n)
+        p00097/count_offsets.npy    int64,  p + 2 entries: value_count k occupies
+                                    rows_by_count[offsets[k]:offsets[k + 1]]
+        p00097/summary.json         the prime's summary statistics (summary_stats.py)
+
+Columns are typed and stored separately, so a reader only touches the
+columns it asks for (memory-mapped).  The last two files are an inverted
+index by value_count: a value_count filter reads the matching row ids
+straight from it, and CardinalityIndex answers "every (p, n) with
+value_count == k" without scanning any column.  read_dataset() falls back
+to the legacy reversed_dickson_values.csv when no binary dataset exists.
+PrimeIndex gives O(1) per-prime slices of a loaded DataFrame.
+
+Shards are written block by block (ShardWriter) and export_csv() streams
+the legacy CSV files one chunk at a time; the cardinality-sorted file is an
+external merge of per-prime sorted runs, so neither step holds the table.
+
+Writes are crash-safe: a shard is filled under p00097.partial/ and renamed
+into place when complete, and the manifest is replaced atomically after
+each shard, so the manifest only ever lists complete shards and an
+interrupted run can be resumed from it.
+"""
+
+import csv
+import heapq
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from value_set_masks import format_values, words_for
+
+FORMAT_NAME = "reversed-dickson-columnar"
+FORMAT_VERSION = 1
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data"))
+DEFAULT_DATASET = os.path.join(DATA_DIR, "reversed_dickson_values")
+DEFAULT_CSV = os.path.join(DATA_DIR, "reversed_dickson_values.csv")
+DEFAULT_SORTED_CSV = os.path.join(DATA_DIR, "reversed_dickson_values_by_cardinality.csv")
+
+# Rows formatted per CSV chunk, and sorted runs opened at once during the merge
+EXPORT_CHUNK_ROWS = 4096
+MERGE_FAN_IN = 256
+
+COLUMNS = ["p", "n", "value_count", "is_permutation", "values"]
+COLUMN_DTYPES = {
+    "n": np.int64,
+    "value_count": np.int32,
+    "is_permutation": np.bool_,
+    "values": np.uint64,
+}
+# Per-shard inverted index by value_count, written when a shard is closed
+COUNT_INDEX_FILES = ("rows_by_count", "count_offsets")
+
+
+PARTIAL_SUFFIX = ".partial"
+
+
+def shard_dir(path, p):
+    """Directory holding the columns of prime p."""
+    return os.path.join(path, f"p{p:05d}")
+
+
+def remove_partial_shards(path):
+    """Delete shards left half-written by an interrupted run."""
+    for name in os.listdir(path):
+        if name.endswith(PARTIAL_SUFFIX):
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+class ShardWriter:
+    """
+    Write one prime's columns block by block.
+
+    The .npy files are preallocated for the final row count and filled
+    through memory maps, so only the current block is ever held in memory.
+    They live in a .partial directory that close() renames into place, so a
+    shard directory is either complete or absent.  Use as a context manager;
+    the row count must be reached before closing.
+    """
+
+    def __init__(self, path, p, rows):
+        self.p = p
+        self.target = shard_dir(path, p)
+        directory = self.target + PARTIAL_SUFFIX
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        self.directory = directory
+        self.rows = rows
+        self.offset = 0
+        self.columns = {}
+        for name, dtype in COLUMN_DTYPES.items():
+            shape = (rows, words_for(p)) if name == "values" else (rows,)
+            self.columns[name] = np.lib.format.open_memmap(
+                os.path.join(directory, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+
+    def append(self, block):
+        """Append a dict of equally long column arrays."""
+        count = len(block["n"])
+        for name, column in self.columns.items():
+            column[self.offset:self.offset + count] = block[name]
+        self.offset += count
+
+    def take(self, rows):
+        """Columns of rows already appended (an int array), read back from the memory maps."""
+        return {name: column[rows] for name, column in self.columns.items()}
+
+    def save_json(self, name, data):
+        """Write data as name.json inside the shard, renamed into place with the columns."""
+        with open(os.path.join(self.directory, f"{name}.json"), "w") as f:
+            json.dump(data, f)
+
+    def close(self):
+        if self.offset != self.rows:
+            raise ValueError(f"shard expected {self.rows} rows, got {self.offset}")
+        for column in self.columns.values():
+            column.flush()
+        order, offsets = build_count_index(self.columns["value_count"], self.p)
+        for name, array in zip(COUNT_INDEX_FILES, (order, offsets)):
+            np.save(os.path.join(self.directory, f"{name}.npy"), array)
+        self.columns = {}
+        if os.path.isdir(self.target):
+            shutil.rmtree(self.target)
+        os.replace(self.directory, self.target)
+
+    def abort(self):
+        """Discard the partial shard."""
+        self.columns = {}
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_shard(path, p, table):
+    """Write one prime's column arrays (as produced by Test.py) to its shard."""
+    with ShardWriter(path, p, len(table["n"])) as writer:
+        writer.append(table)
+
+
+def write_manifest(path, primes, n_stop=None):
+    """
+    Record the primes present in the dataset and the index range of their
+    shards (n_stop None: n = 0..p^2-1 per prime).  The file is replaced
+    atomically, so readers never see a half-written manifest.
+    """
+    manifest = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "columns": COLUMNS,
+        "n_stop": n_stop,
+        "primes": sorted(int(p) for p in primes),
+    }
+    target = os.path.join(path, "manifest.json")
+    with open(target + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(target + ".tmp", target)
+
+
+def read_manifest(path):
+    """Load manifest.json of a binary dataset."""
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} dataset")
+    return manifest
+
+
+def read_prime_columns(path, p, columns, mmap=True):
+    """Return {column: array} for the requested stored columns of prime p."""
+    directory = shard_dir(path, p)
+    mode = "r" if mmap else None
+    return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode) for name in columns}
+
+
+def build_count_index(value_count, p):
+    """
+    Inverted index of one shard: (order, offsets) with order the row ids
+    stably sorted by value_count and offsets[k]:offsets[k + 1] the range of
+    rows with value_count k, for k = 0..p.
+    """
+    value_count = np.asarray(value_count)
+    order = np.argsort(value_count, kind="stable").astype(np.int64)
+    offsets = np.zeros(p + 2, dtype=np.int64)
+    np.cumsum(np.bincount(value_count, minlength=p + 1)[:p + 1], out=offsets[1:])
+    return order, offsets
+
+
+def read_count_index(path, p):
+    """(order, offsets) of prime p's shard; rebuilt in memory for shards written without one."""
+    directory = shard_dir(path, p)
+    if not os.path.exists(os.path.join(directory, "count_offsets.npy")):
+        return build_count_index(read_prime_columns(path, p, ["value_count"])["value_count"], p)
+    index = read_prime_columns(path, p, COUNT_INDEX_FILES)
+    return index["rows_by_count"], np.asarray(index["count_offsets"])
+
+
+def rows_with_value_count(path, p, value_count):
+    """Sorted row ids of prime p whose value_count is one of the given ints."""
+    order, offsets = read_count_index(path, p)
+    slices = [order[offsets[k]:offsets[k + 1]] for k in value_count if 0 <= k <= p]
+    if not slices:
+        return np.zeros(0, dtype=np.int64)
+    return np.sort(np.concatenate(slices))
+
+
+class CardinalityIndex:
+    """
+    Inverted index value_count -> (p, n) over a binary dataset.
+
+        index = CardinalityIndex()
+        p, n = index[2]          # every index n with value_count 2, by (p, n)
+
+    Each lookup reads one slice of each shard's rows_by_count.npy and the
+    matching n entries; no value_count column is scanned.
+    """
+
+    def __init__(self, path=None):
+        self.path = DEFAULT_DATASET if path is None else path
+        self.primes = read_manifest(self.path)["primes"]
+
+    def __getitem__(self, k):
+        ps, ns = [], []
+        for p in self.primes:
+            rows = rows_with_value_count(self.path, p, [k])
+            if len(rows):
+                ns.append(np.asarray(read_prime_columns(self.path, p, ["n"])["n"][rows]))
+                ps.append(np.full(len(rows), p, dtype=np.int64))
+        if not ps:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(ps), np.concatenate(ns)
+
+    def pairs(self, k):
+        """The (p, n) pairs with value_count k as a list of tuples."""
+        return list(zip(*(a.tolist() for a in self[k])))
+
+
+class PrimeIndex:
+    """
+    Per-prime offset index over a DataFrame with a "p" column.
+
+    Rows are sorted by (p, n) once (skipped when already sorted, as
+    read_dataset() returns them), and a start/end table turns every
+    per-prime selection into a slice instead of a df[df["p"] == p] scan.
+    """
+
+    def __init__(self, df):
+        keys = [c for c in ("p", "n") if c in df.columns]
+        p = df["p"].to_numpy()
+        n = df["n"].to_numpy() if "n" in df.columns else np.zeros(len(df))
+        in_order = (p[:-1] < p[1:]) | ((p[:-1] == p[1:]) & (n[:-1] <= n[1:]))
+        if not in_order.all():
+            df = df.sort_values(keys, kind="stable")
+        self.df = df.reset_index(drop=True)
+        p = self.df["p"].to_numpy()
+        primes, starts = np.unique(p, return_index=True)
+        ends = np.append(starts[1:], len(p))
+        self.primes = primes.tolist()
+        self.offsets = {q: (int(s), int(e)) for q, s, e in zip(self.primes, starts, ends)}
+
+    def __contains__(self, p):
+        return p in self.offsets
+
+    def __getitem__(self, p):
+        """Rows of prime p as a DataFrame slice (empty when p is absent)."""
+        start, end = self.offsets.get(p, (0, 0))
+        return self.df.iloc[start:end]
+
+    def column(self, p, name):
+        """Column name of prime p as a NumPy view."""
+        start, end = self.offsets.get(p, (0, 0))
+        return self.df[name].to_numpy()[start:end]
+
+    def groups(self):
+        """Iterate (p, rows) in ascending p."""
+        for p in self.primes:
+            yield p, self[p]
+
+
+def _read_binary(path, columns, value_count):
+    # Read at least one stored column so the row count is known.
+    stored = [c for c in columns if c != "p"] or ["n"]
+    frames = []
+    for p in read_manifest(path)["primes"]:
+        if value_count is None:
+            data = read_prime_columns(path, p, stored)
+        else:
+            # Push the filter down: take the matching rows from the inverted index.
+            keep = rows_with_value_count(path, p, value_count.tolist())
+            if keep.size == 0:
+                continue
+            data = {name: column[keep] for name, column in read_prime_columns(path, p, stored).items()}
+        frame = {}
+        for name in columns:
+            if name == "p":
+                frame["p"] = np.full(len(data[stored[0]]), p, dtype=np.int64)
+            elif name == "values":
+                frame["values"] = format_values(np.asarray(data["values"]), p)
+            else:
+                frame[name] = np.asarray(data[name])
+        frames.append(pd.DataFrame(frame, columns=columns))
+    if not frames:
+        return pd.DataFrame({name: pd.Series(dtype=object if name == "values" else COLUMN_DTYPES.get(name, np.int64))
+                             for name in columns})
+    return pd.concat(frames, ignore_index=True)
+
+
+def _write_rows(writer, p, columns, rows):
+    for start in range(0, len(rows), EXPORT_CHUNK_ROWS):
+        chunk = rows[start:start + EXPORT_CHUNK_ROWS]
+        writer.writerows(zip(
+            [p] * len(chunk),
+            columns["n"][chunk].tolist(),
+            columns["value_count"][chunk].tolist(),
+            columns["is_permutation"][chunk].tolist(),
+            format_values(columns["values"][chunk], p),
+        ))
+
+
+def _merge_key(line):
+    # CSV rows start with p,n,value_count; the values column comes last
+    p, n, value_count, _ = line.split(",", 3)
+    return -int(value_count), int(p), int(n)
+
+
+def _merge_runs(runs, out, tmpdir):
+    """
+    k-way merge of sorted run files into the open file out, at most
+    MERGE_FAN_IN files at a time (larger inputs are merged in passes).
+    """
+    generation = 0
+    while len(runs) > MERGE_FAN_IN:
+        merged = []
+        for start in range(0, len(runs), MERGE_FAN_IN):
+            target = os.path.join(tmpdir, f"merge{generation}_{start}.csv")
+            with open(target, "w", newline="") as f:
+                _merge_runs(runs[start:start + MERGE_FAN_IN], f, tmpdir)
+            merged.append(target)
+        runs = merged
+        generation += 1
+
+    files = [open(run, newline="") for run in runs]
+    try:
+        out.writelines(heapq.merge(*files, key=_merge_key))
+    finally:
+        for f in files:
+            f.close()
+
+
+def write_tables_csv(csv_path, tables):
+    """
+    Write (p, table) pairs of in-memory column arrays (as produced by Test.py)
+    to a CSV file in the legacy layout, readable by read_dataset(path=...).
+    """
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(COLUMNS)
+        for p, table in tables:
+            _write_rows(writer, p, table, np.arange(len(table["n"])))
+
+
+def export_csv(path=DEFAULT_DATASET, csv_path=DEFAULT_CSV, sorted_csv_path=DEFAULT_SORTED_CSV):
+    """
+    Write the legacy CSV files from a binary dataset without loading it.
+
+    csv_path gets the rows in (p, n) order, streamed shard by shard.  Each
+    shard is also written as a run sorted by (value_count desc, n), and the
+    runs are merged into sorted_csv_path ordered by (value_count desc, p, n).
+    Memory use is bounded by one shard's n and value_count columns.
+    """
+    primes = read_manifest(path)["primes"]
+    tmpdir = tempfile.mkdtemp(prefix="dickson-runs-", dir=os.path.dirname(os.path.abspath(sorted_csv_path)))
+    try:
+        runs = []
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(COLUMNS)
+            for p in primes:
+                columns = read_prime_columns(path, p, ["n", "value_count", "is_permutation", "values"])
+                _write_rows(writer, p, columns, np.arange(len(columns["n"])))
+
+                order = np.lexsort((np.asarray(columns["n"]), -np.asarray(columns["value_count"], dtype=np.int64)))
+                run = os.path.join(tmpdir, f"run_p{p:05d}.csv")
+                with open(run, "w", newline="") as r:
+                    _write_rows(csv.writer(r, lineterminator="\n"), p, columns, order)
+                runs.append(run)
+
+        with open(sorted_csv_path, "w", newline="") as f:
+            csv.writer(f, lineterminator="\n").writerow(COLUMNS)
+            _merge_runs(runs, f, tmpdir)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def read_dataset(columns=("p", "n", "value_count"), value_count=None, path=None):
+    """
+    Load the dataset as a DataFrame with only the requested columns.
+
+    value_count (an int or a list of ints) keeps only rows with that
+    cardinality.  path may be a binary dataset directory or a CSV file; by
+    default the binary dataset is used when present, else the legacy CSV.
+    Raises FileNotFoundError when neither exists.
+    """
+    columns = list(columns)
+    if value_count is not None:
+        value_count = np.atleast_1d(value_count)
+
+    if path is None:
+        path = DEFAULT_DATASET if os.path.isdir(DEFAULT_DATASET) else DEFAULT_CSV
+
+    if os.path.isdir(path):
+        return _read_binary(path, columns, value_count)
+
+    usecols = columns if value_count is None or "value_count" in columns else columns + ["value_count"]
+    df = pd.read_csv(path, usecols=usecols, dtype={"values": str})
+    if value_count is not None:
+        df = df[df["value_count"].isin(value_count)].reset_index(drop=True)
+    return df[columns]
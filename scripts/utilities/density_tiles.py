@@ -0,0 +1,149 @@
+"""
+Multi-resolution density tiles of (n, value_count) over every prime.
+
+Used by the large-data explorer of plot_cardinality_2_interactive.py.  The
+points span [0, X) x [0, Y), with X the longest row of the cardinality
+matrix (p^2 for the largest p) and Y the largest value_count + 1 (at most
+p), so X is far larger than Y and the zoom that matters is along n.  The
+tiles therefore split n only: zoom level L cuts [0, X) into 2^L tiles, and
+each tile holds a TILE x y_bins histogram, TILE columns of n by
+y_bins = min(Y, Y_BINS) rows of value_count.  Counts are stored
+log-quantized in one byte per cell, which is all a log colour scale needs:
+
+    0            empty cell
+    q = 1..255   about 2^((q - 1) / LOG_STEPS) points
+
+The leaves split n the same way at their own level, deep enough that one
+leaf holds about LEAF_POINTS points, and store the points themselves
+(n, value_count, p), so a zoomed-in view can draw every point.
+
+Everything goes into one binary sidecar next to a small JSON index:
+
+    <prefix>.bin    little-endian arrays, each starting on an 8-byte boundary
+    <prefix>.json   extents, tile shape, the byte offset of every nonempty
+                    histogram tile and the point range of every leaf
+
+A viewer fetches only the byte ranges of the tiles in view, so the cost of
+a redraw depends on the screen, not on the number of points.
+"""
+
+import json
+import os
+
+import numpy as np
+
+# Columns of n per histogram tile
+TILE = 256
+
+# Rows of value_count per histogram tile (fewer when Y is smaller)
+Y_BINS = 128
+
+# Quantization steps per doubling of the count
+LOG_STEPS = 8
+
+# Histogram levels stop at the leaf level (deeper views draw the points) or
+# at 2^MAX_LEVEL tiles, i.e. 2^MAX_LEVEL * TILE columns of n
+MAX_LEVEL = 8
+
+# Leaves are split until one holds about this many points (up to 2^MAX_LEAF_LEVEL leaves)
+LEAF_POINTS = 1 << 15
+MAX_LEAF_LEVEL = 16
+
+
+def collect_points(matrix, primes=None):
+    """(n, value_count, p) columns (uint32, uint16, uint16) for every stored (p, n) of the matrix."""
+    primes = matrix.primes if primes is None else primes
+    if max(primes, default=0) > np.iinfo(np.uint16).max:
+        raise ValueError("density tiles store p as uint16 (p <= 65535)")
+    ns, counts, ps = [], [], []
+    for p in primes:
+        row = matrix.row(p)
+        # n < p^2 < 2^32 for p <= 65535
+        ns.append(np.arange(len(row), dtype=np.uint32))
+        counts.append(np.asarray(row, dtype=np.uint16))
+        ps.append(np.full(len(row), p, dtype=np.uint16))
+    return np.concatenate(ns), np.concatenate(counts), np.concatenate(ps)
+
+
+def quantize_counts(counts):
+    """uint8 log-quantized counts: 0 for empty cells, else 1 + round(LOG_STEPS * log2(count)), capped at 255."""
+    q = np.zeros(counts.shape, dtype=np.uint8)
+    filled = counts > 0
+    q[filled] = np.minimum(255, 1 + np.rint(LOG_STEPS * np.log2(counts[filled]))).astype(np.uint8)
+    return q
+
+
+def leaf_level(points):
+    """Smallest level at which 2^level leaves hold about LEAF_POINTS points each."""
+    level = 0
+    while level < MAX_LEAF_LEVEL and points > LEAF_POINTS * 2**level:
+        level += 1
+    return level
+
+
+class _SidecarWriter:
+    def __init__(self, f):
+        self.f = f
+        self.offset = 0
+
+    def write(self, array):
+        """Append array (little-endian) on an 8-byte boundary and return its byte offset."""
+        pad = -self.offset % 8
+        self.f.write(b"\0" * pad)
+        self.offset += pad
+        start = self.offset
+        data = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<")).tobytes()
+        self.f.write(data)
+        self.offset += len(data)
+        return start
+
+
+def write_density_tiles(matrix, prefix, primes=None):
+    """
+    Write <prefix>.bin and <prefix>.json for the (n, value_count) points of
+    matrix (a CardinalityMatrix); returns the index written to the JSON.
+    """
+    n, value_count, p = collect_points(matrix, primes)
+    if len(n) == 0:
+        raise ValueError("no points to tile")
+    x_extent = int(n.max()) + 1
+    y_extent = int(value_count.max()) + 1
+    y_bins = min(y_extent, Y_BINS)
+    leaves = leaf_level(len(n))
+    max_level = min(MAX_LEVEL, leaves)
+    columns = 2**max_level * TILE
+
+    cx = n.astype(np.int64) * columns // x_extent
+    cy = value_count.astype(np.int64) * y_bins // y_extent
+    grid = np.bincount(cx * y_bins + cy, minlength=columns * y_bins).reshape(columns, y_bins)
+
+    index = {
+        "x_extent": x_extent, "y_extent": y_extent, "tile": TILE, "y_bins": y_bins,
+        "log_steps": LOG_STEPS, "max_level": max_level, "leaf_level": leaves,
+        "points": len(n), "primes": [int(q) for q in np.unique(p)], "levels": [],
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(prefix)), exist_ok=True)
+    with open(prefix + ".bin.tmp", "wb") as f:
+        out = _SidecarWriter(f)
+        for level in range(max_level + 1):
+            tiles = grid.reshape(2**level, TILE, 2**(max_level - level), y_bins).sum(axis=2)
+            # tiles[t, ix, iy]: column ix, row iy of tile t (n major)
+            offsets = {str(t): out.write(quantize_counts(tiles[t])) for t in np.flatnonzero(tiles.sum(axis=(1, 2)))}
+            index["levels"].append({"level": level, "tiles": offsets})
+
+        # Points sorted by leaf
+        leaf = n.astype(np.int64) * 2**leaves // x_extent
+        order = np.argsort(leaf, kind="stable")
+        leaf_ids, starts, sizes = np.unique(leaf[order], return_index=True, return_counts=True)
+        index["point_columns"] = {
+            "n": {"offset": out.write(n[order]), "dtype": "uint32"},
+            "value_count": {"offset": out.write(value_count[order]), "dtype": "uint16"},
+            "p": {"offset": out.write(p[order]), "dtype": "uint16"},
+        }
+        index["leaves"] = {str(i): [int(s), int(c)] for i, s, c in zip(leaf_ids.tolist(), starts, sizes)}
+
+    with open(prefix + ".json.tmp", "w") as f:
+        json.dump(index, f)
+    os.replace(prefix + ".bin.tmp", prefix + ".bin")
+    os.replace(prefix + ".json.tmp", prefix + ".json")
+    return index
@@ -0,0 +1,211 @@
+"""
+Fast evaluation of Dickson polynomials mod p.
+
+Both polynomial families used in this project are Lucas V-sequences
+
+    V_0(P, Q) = 2
+    V_1(P, Q) = P
+    V_n(P, Q) = P * V_{n-1}(P, Q) - Q * V_{n-2}(P, Q)
+
+with
+    Dickson polynomial           D_n(x, a) = V_n(x, a)   (dickson_polynomial_modp, dickson_mod)
+    reversed Dickson polynomial  D_n(a, x) = V_n(a, x)   (Test.py, reversed_dickson_polynomial)
+
+Instead of walking the recurrence n times, lucas_v() uses the doubling formulas
+
+    V_{2k}   = V_k^2 - 2 Q^k
+    V_{2k+1} = V_k * V_{k+1} - P * Q^k
+
+so a single evaluation costs O(log n) multiplications.  P and Q may be NumPy
+int64 arrays, in which case all x in F_p are evaluated at once and a value set
+costs O(p log n) instead of O(p * n).  n may be an array too, which
+evaluates many indices in one ladder (e.g. a column of n against a row of x).
+
+A second backend, backend="fp2", uses the closed form.  The roots gamma,
+P - gamma of t^2 - P t + Q lie in F_p or in F_{p^2}, and V_n = gamma^n +
+(P - gamma)^n.  For the Dickson case (Q = 1) this is the familiar
+D_n = gamma^n + gamma^(-n) with x = gamma + gamma^(-1).  The roots are
+computed once per (p, a) and reused for every n.
+
+Usage from another scripts/ subdirectory:
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+    from dickson_eval import reversed_dickson_values
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from fp2 import Fp2Array, quadratic_nonresidue, sqrt_table
+
+# Version of the evaluation code; bump it whenever a change could alter any
+# computed value, so that results cached under the old version are not reused.
+ENGINE_VERSION = 1
+
+# Largest modulus for which the int64 products below cannot overflow
+# (every intermediate is bounded by 2 * p^2).
+MAX_ARRAY_MODULUS = 2**31
+
+
+def lucas_v(n, P, Q, p):
+    """
+    Compute V_n(P, Q) mod p in O(log n) steps.
+
+    P and Q may be Python ints (any size of p) or int64 NumPy arrays
+    (p < MAX_ARRAY_MODULUS); arrays are evaluated elementwise and broadcast.
+    n may also be an int64 array, broadcast against P and Q.
+    """
+    if isinstance(n, np.ndarray):
+        return _lucas_v_indices(n, P, Q, p)
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    if isinstance(P, np.ndarray) or isinstance(Q, np.ndarray):
+        if p >= MAX_ARRAY_MODULUS:
+            raise ValueError(f"array evaluation needs p < {MAX_ARRAY_MODULUS}; pass Python ints instead")
+        P = np.asarray(P, dtype=np.int64) % p
+        Q = np.asarray(Q, dtype=np.int64) % p
+    else:
+        P, Q = P % p, Q % p
+
+    # Invariant: (v0, v1, qk) = (V_k, V_{k+1}, Q^k) for k = the bits of n read so far
+    v0, v1, qk = 2 % p, P, 1 % p
+    for bit in bin(n)[2:]:
+        if bit == "1":
+            # k -> 2k + 1
+            v0 = (v0 * v1 - P * qk) % p
+            v1 = (v1 * v1 - 2 * (qk * Q % p)) % p
+            qk = qk * qk % p * Q % p
+        else:
+            # k -> 2k
+            v1 = (v0 * v1 - P * qk) % p
+            v0 = (v0 * v0 - 2 * qk) % p
+            qk = qk * qk % p
+    return v0
+
+
+def _lucas_v_indices(n, P, Q, p):
+    """lucas_v() for an array of indices: one ladder, bits selected per element."""
+    if p >= MAX_ARRAY_MODULUS:
+        raise ValueError(f"array evaluation needs p < {MAX_ARRAY_MODULUS}")
+    n = np.asarray(n, dtype=np.int64)
+    if n.size and n.min() < 0:
+        raise ValueError("n must be non-negative")
+    P = np.asarray(P, dtype=np.int64) % p
+    Q = np.asarray(Q, dtype=np.int64) % p
+    shape = np.broadcast_shapes(n.shape, P.shape, Q.shape)
+
+    # Same invariant as lucas_v(); leading zero bits keep (V_0, V_1, Q^0) fixed,
+    # so indices of different bit lengths share the ladder.
+    v0 = np.full(shape, 2 % p, dtype=np.int64)
+    v1 = np.broadcast_to(P, shape).copy()
+    qk = np.ones(shape, dtype=np.int64)
+    for shift in reversed(range(int(n.max(initial=0)).bit_length())):
+        bit = ((n >> shift) & 1).astype(bool)
+        cross = (v0 * v1 - P * qk) % p
+        qk2 = qk * qk % p
+        v0 = np.where(bit, cross, (v0 * v0 - 2 * qk) % p)
+        v1 = np.where(bit, (v1 * v1 - 2 * (qk * Q % p)) % p, cross)
+        qk = np.where(bit, qk2 * Q % p, qk2)
+    return v0
+
+
+def characteristic_roots(P, Q, p):
+    """
+    Return gamma, one root of t^2 - P t + Q per element, as an Fp2Array.
+
+    With Delta = P^2 - 4Q, gamma = (P + sqrt(Delta)) / 2.  When Delta is a
+    square mod p the root lies in F_p (im = 0); otherwise sqrt(Delta) = t * s
+    with t^2 = Delta / c, and gamma lies in F_{p^2} outside F_p.  The other root is
+    P - gamma in both cases.  p must be an odd prime.
+    """
+    P = np.asarray(P, dtype=np.int64) % p
+    Q = np.asarray(Q, dtype=np.int64) % p
+    P, Q = np.broadcast_arrays(P, Q)
+    c = quadratic_nonresidue(p)
+    roots = sqrt_table(p)
+    inv2 = pow(2, -1, p)
+
+    delta = (P * P - 4 * Q) % p
+    r = roots[delta]
+    split = r >= 0
+    t = roots[delta * pow(c, -1, p) % p]
+    re = np.where(split, (P + r) * inv2, P * inv2)
+    im = np.where(split, 0, t * inv2)
+    return Fp2Array(re, im, p, c)
+
+
+def _pow_mod(base, n, p):
+    """Elementwise base^n mod p for an int64 array base (square-and-multiply)."""
+    result = np.ones_like(base)
+    while n:
+        if n & 1:
+            result = result * base % p
+        n >>= 1
+        if n:
+            base = base * base % p
+    return result
+
+
+def lucas_v_fp2(n, P, gamma):
+    """
+    Compute V_n(P, Q) = gamma^n + (P - gamma)^n from precomputed roots.
+
+    Where the roots lie in F_p both powers are plain modular powers.  Where
+    they lie in F_{p^2} the second root is the conjugate of gamma, so
+    V_n = 2 * Re(gamma^n) and a single F_{p^2} power suffices.  Returns an
+    int64 array (the result always lies in F_p).
+
+    The exponents are first reduced by the group orders: nonzero roots in F_p
+    satisfy r^(p-1) = 1, so n -> (n - 1) % (p - 1) + 1 (kept >= 1 so that a
+    zero root still gives 0).  Roots outside F_p satisfy gamma^(p+1) =
+    N(gamma) in F_p, so gamma^n = N(gamma)^q * gamma^r with n = q (p + 1) + r,
+    and only the short power gamma^r is taken in F_{p^2}.  Each power then
+    costs O(log p) steps whatever n is.
+    """
+    p = gamma.p
+    P = np.broadcast_to(np.asarray(P, dtype=np.int64) % p, gamma.re.shape)
+    split = gamma.im == 0
+    result = np.empty(len(gamma), dtype=np.int64)
+
+    roots = np.concatenate([gamma.re[split], (P[split] - gamma.re[split]) % p])
+    powers = _pow_mod(roots, (n - 1) % (p - 1) + 1 if n else 0, p)
+    half = len(powers) // 2
+    result[split] = (powers[:half] + powers[half:]) % p
+
+    inert = ~split
+    g = Fp2Array(gamma.re[inert], gamma.im[inert], p, gamma.c)
+    q, r = divmod(n % (p * p - 1), p + 1)
+    result[inert] = 2 * (g ** r).re * _pow_mod(g.norm(), q, p) % p
+    return result
+
+
+@lru_cache(maxsize=16)
+def _cached_roots(p, a, reversed_family):
+    x = np.arange(p, dtype=np.int64)
+    P, Q = (a, x) if reversed_family else (x, a)
+    return characteristic_roots(P, Q, p)
+
+
+def reversed_dickson_values(n, p, a=1, backend="lucas"):
+    """
+    Return the array [D_n(a, x) mod p for x = 0..p-1] of the reversed Dickson polynomial.
+
+    backend is "lucas" (doubling, any p) or "fp2" (closed form, odd p).
+    """
+    x = np.arange(p, dtype=np.int64)
+    if backend == "fp2":
+        return lucas_v_fp2(n, a % p, _cached_roots(p, a % p, True))
+    return np.broadcast_to(lucas_v(n, a, x, p), (p,))
+
+
+def dickson_values(n, p, a=1, backend="lucas"):
+    """
+    Return the array [D_n(x, a) mod p for x = 0..p-1] of the Dickson polynomial.
+
+    backend is "lucas" (doubling, any p) or "fp2" (closed form, odd p).
+    """
+    x = np.arange(p, dtype=np.int64)
+    if backend == "fp2":
+        return lucas_v_fp2(n, x, _cached_roots(p, a % p, False))
+    return np.broadcast_to(lucas_v(n, x, a, p), (p,))
@@ -0,0 +1,159 @@
+"""
+Coefficient-level construction of Dickson polynomials.
+
+The Dickson polynomial D_n(x, a) (recurrence D_n = x D_{n-1} - a D_{n-2},
+D_0 = 2, D_1 = x) has the closed form
+
+    D_n(x, a) = sum_{i=0}^{floor(n/2)} n / (n - i) * C(n - i, i) * (-a)^i * x^(n - 2i)
+
+for n >= 1, where n / (n - i) * C(n - i, i) = C(n - i, i) + C(n - i - 1, i - 1)
+is an integer.  Building the coefficient list directly costs O(n) big-integer
+operations (or O(n log_p n) word operations mod p, using Lucas' theorem),
+instead of the O(n^2)-size symbolic expansion of the recurrence.
+
+Coefficient lists are low-to-high: coeffs[k] is the coefficient of x^k.
+
+As functions on F_p the polynomials only matter modulo x^p - x, and every
+function F_p -> F_p is a unique polynomial of degree < p.  reduced_dickson()
+and reduced_reversed_dickson() compute that representative directly: the
+Lucas doubling ladder of dickson_eval.py run in GF(p)[x] / (x^p - x), where
+a product is one np.convolve followed by folding x^k to x^(k - (p - 1)) for
+k >= p.  That is O(p^2 log n) work, and no polynomial of degree n is ever
+formed.
+
+Usage from another scripts/ subdirectory:
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+    from dickson_poly import dickson_coefficients
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# np.convolve sums up to p products below p^2 in int64
+MAX_REDUCED_MODULUS = 2**21
+
+
+@lru_cache(maxsize=16)
+def _factorials_mod(p):
+    fact = [1] * p
+    for i in range(1, p):
+        fact[i] = fact[i - 1] * i % p
+    inv_fact = [pow(f, -1, p) for f in fact]
+    return fact, inv_fact
+
+
+def binomial_mod(m, k, p):
+    """C(m, k) mod the prime p via Lucas' theorem (0 when k < 0 or k > m)."""
+    if k < 0 or k > m:
+        return 0
+    fact, inv_fact = _factorials_mod(p)
+    result = 1
+    while k:
+        mi, ki = m % p, k % p
+        if ki > mi:
+            return 0
+        result = result * fact[mi] % p * inv_fact[ki] % p * inv_fact[mi - ki] % p
+        m //= p
+        k //= p
+    return result
+
+
+def dickson_coefficients(n, a=1, p=None):
+    """
+    Coefficients of D_n(x, a), low to high, as a list of n + 1 ints.
+
+    With p given the coefficients are reduced mod p (entries in [0, p)),
+    i.e. D_n(x, a) as an element of GF(p)[x].
+    """
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    coeffs = [0] * (n + 1)
+    if n == 0:
+        coeffs[0] = 2 if p is None else 2 % p
+        return coeffs
+
+    if p is None:
+        # c_i = n / (n - i) * C(n - i, i); c_{i+1} / c_i = (n - 2i)(n - 2i - 1) / ((i + 1)(n - i - 1))
+        c, sign = 1, 1
+        for i in range(n // 2 + 1):
+            coeffs[n - 2 * i] = c * sign
+            if n - i - 1 > 0:
+                c = c * (n - 2 * i) * (n - 2 * i - 1) // ((i + 1) * (n - i - 1))
+            sign *= -a
+        return coeffs
+
+    sign = 1
+    for i in range(n // 2 + 1):
+        c = binomial_mod(n - i, i, p) + binomial_mod(n - i - 1, i - 1, p)
+        coeffs[n - 2 * i] = c * sign % p
+        sign = sign * -a % p
+    return coeffs
+
+
+def mul_reduced(f, g, p):
+    """Product of two length-p coefficient arrays in GF(p)[x] / (x^p - x)."""
+    prod = np.convolve(f, g) % p
+    out = prod[:p].copy()
+    # x^k = x^(k - (p - 1)) for k = p..2p-2, since x^p = x
+    out[1:p] += prod[p:]
+    return out % p
+
+
+def _constant(c, p):
+    out = np.zeros(p, dtype=np.int64)
+    out[0] = c % p
+    return out
+
+
+def lucas_v_reduced(n, P, Q, p):
+    """
+    V_n(P, Q) in GF(p)[x] / (x^p - x) for polynomial arguments P and Q given
+    as length-p int64 coefficient arrays (see dickson_eval.lucas_v for the
+    ladder).  Returns the length-p coefficient array of the result.
+    """
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    if p >= MAX_REDUCED_MODULUS:
+        raise ValueError(f"reduced arithmetic needs p < {MAX_REDUCED_MODULUS}")
+    P = np.asarray(P, dtype=np.int64) % p
+    Q = np.asarray(Q, dtype=np.int64) % p
+
+    v0, v1, qk = _constant(2, p), P.copy(), _constant(1, p)
+    for bit in bin(n)[2:]:
+        cross = (mul_reduced(v0, v1, p) - mul_reduced(P, qk, p)) % p
+        if bit == "1":
+            v1 = (mul_reduced(v1, v1, p) - 2 * mul_reduced(qk, Q, p)) % p
+            v0 = cross
+            qk = mul_reduced(mul_reduced(qk, qk, p), Q, p)
+        else:
+            v0 = (mul_reduced(v0, v0, p) - 2 * qk) % p
+            v1 = cross
+            qk = mul_reduced(qk, qk, p)
+    return v0
+
+
+def _monomial_x(p):
+    x = np.zeros(p, dtype=np.int64)
+    x[1 % p] = 1
+    return x
+
+
+def reduced_dickson(n, p, a=1):
+    """Coefficients (low to high, length p) of D_n(x, a) mod (p, x^p - x)."""
+    return lucas_v_reduced(n, _monomial_x(p), _constant(a, p), p)
+
+
+def reduced_reversed_dickson(n, p, a=1):
+    """Coefficients (low to high, length p) of the reversed D_n(a, x) mod (p, x^p - x)."""
+    return lucas_v_reduced(n, _constant(a, p), _monomial_x(p), p)
+
+
+def evaluate_all(coeffs, p):
+    """Values of the polynomial at every x in F_p (Horner, vectorized over x)."""
+    x = np.arange(p, dtype=np.int64)
+    values = np.zeros(p, dtype=np.int64)
+    for c in coeffs[::-1]:
+        values = (values * x + int(c)) % p
+    return values
@@ -0,0 +1,186 @@
+"""
+Multiplicity (preimage-size) profiles of the reversed Dickson table.
+
+The dataset keeps only which values D_n(1, x) takes over F_p.  The profile of
+an index n also says how often each value is taken: with
+
+    c_v = #{x in F_p : D_n(1, x) = v}          (the preimage size of v)
+
+the profile is the histogram of the c_v, i.e. for each multiplicity m >= 1
+the number of values v hit exactly m times.  It is a histogram of
+histograms, so it is short (a few (m, count) pairs per n) and satisfies
+
+    sum(count) = value_count,   sum(m * count) = p.
+
+Both histograms come from np.bincount over the engine's value block, so
+Test.py --multiplicities records them in the same pass that fills the
+shard.  They are stored in CSR form next to the other columns:
+
+    p00097/multiplicity_offsets.npy   int64, rows + 1: the pairs of index n are
+                                      entries offsets[n]:offsets[n + 1] of
+    p00097/multiplicity_sizes.npy     int32, the multiplicities m (ascending per n)
+    p00097/multiplicity_counts.npy    int32, how many values are hit m times
+
+    profiles = read_profiles(dataset_dir, 97)
+    profiles[9408]                    # {1: 1, 96: 1}
+"""
+
+import os
+
+import numpy as np
+
+from dataset import shard_dir
+
+PROFILE_FILES = ("multiplicity_offsets", "multiplicity_sizes", "multiplicity_counts")
+
+
+def block_multiplicities(block, p):
+    """
+    Preimage sizes of block (an int array of shape (rows, p) with values in
+    [0, p)): entry [i, v] counts the x with block[i, x] == v.
+    """
+    rows = block.shape[0]
+    offsets = np.arange(rows, dtype=np.int64)[:, None] * p
+    return np.bincount((block + offsets).ravel(), minlength=rows * p).reshape(rows, p)
+
+
+def block_profiles(block, p, multiplicity=None):
+    """
+    Profiles of every row of block, as CSR pieces (lengths, sizes, counts):
+    row i owns lengths[i] consecutive (size, count) pairs.  multiplicity is
+    block_multiplicities(block, p) when the caller already has it.
+    """
+    if multiplicity is None:
+        multiplicity = block_multiplicities(block, p)
+    rows = block.shape[0]
+    offsets = np.arange(rows, dtype=np.int64)[:, None] * (p + 1)
+    # histogram[i * (p + 1) + m]: number of values with preimage size m in row i
+    histogram = np.bincount((multiplicity + offsets).ravel(), minlength=rows * (p + 1))
+    histogram[::p + 1] = 0
+    nonzero = np.flatnonzero(histogram)
+    row, size = np.divmod(nonzero, p + 1)
+    return (np.bincount(row, minlength=rows), size.astype(np.int32),
+            histogram[nonzero].astype(np.int32))
+
+
+def value_profile(values, p):
+    """Profile {m: count} of one array of values in [0, p)."""
+    lengths, sizes, counts = block_profiles(np.asarray(values, dtype=np.int64)[None, :], p)
+    return dict(zip(sizes.tolist(), counts.tolist()))
+
+
+def gather_entries(starts, lengths):
+    """Positions of the entries of CSR rows with the given starts and lengths, row after row."""
+    # Entry j of the result comes from starts[row] + (its position within the row)
+    first = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return first + np.arange(int(lengths.sum()))
+
+
+class ProfileWriter:
+    """
+    Append the profiles of a shard block by block into its directory.
+
+    The number of pairs is only known at the end, so sizes and counts are
+    streamed to raw files and converted to .npy by close().  Point it at the
+    ShardWriter's directory and close it before the shard, so the profiles
+    are renamed into place with the columns.
+    """
+
+    def __init__(self, directory, rows):
+        self.directory = directory
+        self.rows = rows
+        self.offsets = np.lib.format.open_memmap(
+            os.path.join(directory, "multiplicity_offsets.npy"), mode="w+", dtype=np.int64, shape=(rows + 1,))
+        self.offsets[0] = 0
+        self.row = 0
+        self.raw = {name: open(os.path.join(directory, f"{name}.raw"), "wb") for name in PROFILE_FILES[1:]}
+
+    def append(self, profiles):
+        lengths, sizes, counts = profiles
+        end = self.row + len(lengths)
+        self.offsets[self.row + 1:end + 1] = self.offsets[self.row] + np.cumsum(lengths)
+        self.row = end
+        self.raw["multiplicity_sizes"].write(sizes.astype("<i4").tobytes())
+        self.raw["multiplicity_counts"].write(counts.astype("<i4").tobytes())
+
+    def take(self, rows):
+        """CSR pieces of rows already appended (an int array), read back from the files."""
+        starts = np.asarray(self.offsets[rows])
+        lengths = np.asarray(self.offsets[rows + 1]) - starts
+        source = gather_entries(starts, lengths)
+        pieces = [lengths]
+        for name, f in self.raw.items():
+            f.flush()
+            pieces.append(np.memmap(os.path.join(self.directory, f"{name}.raw"), dtype="<i4", mode="r")[source]
+                          .astype(np.int32))
+        return tuple(pieces)
+
+    def close(self):
+        if self.row != self.rows:
+            raise ValueError(f"profiles expected {self.rows} rows, got {self.row}")
+        self.offsets.flush()
+        self.offsets = None
+        for name, f in self.raw.items():
+            f.close()
+            raw = os.path.join(self.directory, f"{name}.raw")
+            np.save(os.path.join(self.directory, f"{name}.npy"), np.fromfile(raw, dtype="<i4").astype(np.int32))
+            os.remove(raw)
+        self.raw = {}
+
+
+def has_profiles(path, p):
+    """True when prime p's shard was written with --multiplicities."""
+    return os.path.exists(os.path.join(shard_dir(path, p), "multiplicity_counts.npy"))
+
+
+class MultiplicityProfiles:
+    """
+    Memory-mapped profiles of one prime.
+
+        profiles[n]            {m: count} for index n
+        profiles.rows_with(d)  indices n whose profile is exactly the dict d
+        profiles.max_multiplicity()
+    """
+
+    def __init__(self, offsets, sizes, counts):
+        self.offsets = offsets
+        self.sizes = sizes
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, n):
+        start, end = self.offsets[n], self.offsets[n + 1]
+        return dict(zip(self.sizes[start:end].tolist(), self.counts[start:end].tolist()))
+
+    def max_multiplicity(self):
+        """Largest preimage size of each index n (an int32 array)."""
+        ends = np.asarray(self.offsets[1:]) - 1
+        return np.asarray(self.sizes)[ends]
+
+    def rows_with(self, profile):
+        """Indices n whose profile equals profile (a {m: count} dict)."""
+        lengths = np.diff(self.offsets)
+        match = lengths == len(profile)
+        if not match.any():
+            return np.zeros(0, dtype=np.int64)
+        sizes, counts = np.asarray(self.sizes), np.asarray(self.counts)
+        for j, (m, count) in enumerate(sorted(profile.items())):
+            at = np.asarray(self.offsets[:-1])[match] + j
+            keep = (sizes[at] == m) & (counts[at] == count)
+            match[np.flatnonzero(match)[~keep]] = False
+        return np.flatnonzero(match)
+
+
+def read_profiles(path, p):
+    """
+    MultiplicityProfiles of prime p's shard.  Raises FileNotFoundError when
+    the shard has none (generate it with Test.py --multiplicities).
+    """
+    if not has_profiles(path, p):
+        raise FileNotFoundError(f"no multiplicity profiles for p = {p} in {path}; "
+                                f"run Test.py --multiplicities")
+    directory = shard_dir(path, p)
+    return MultiplicityProfiles(*(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+                                  for name in PROFILE_FILES))
@@ -0,0 +1,164 @@
+"""
+Prime enumeration and primality tests shared by the scripts.
+
+PrimeSieve is a segmented sieve of Eratosthenes over the odd numbers only,
+stored bit-packed (bit i of the table <=> 2i + 1 is prime), so the table
+for every number below 10^8 takes about 6 MB and is built a segment at a
+time in a few hundred milliseconds.  Once built, a primality lookup is a
+single bit test and works on whole NumPy arrays.
+
+The module-level helpers share one sieve that grows on demand:
+
+    is_prime(n)          bit test up to SIEVE_LIMIT, Miller-Rabin beyond
+    primes_up_to(m)      all primes <= m as an int64 array
+    odd_primes_up_to(m)  the same without 2 (the primes Test.py runs over)
+    twin_primes(m)       the primes p <= m for which p + 2 is prime too
+"""
+
+import numpy as np
+
+# Odd numbers sieved per segment (a bool array of this many bytes)
+SEGMENT_ODDS = 1 << 18
+
+# is_prime() uses the shared sieve below this bound and Miller-Rabin above it
+SIEVE_LIMIT = 10**8
+
+# Deterministic Miller-Rabin bases for every n < 3.3 * 10^24
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def _small_odd_primes(limit):
+    """Odd primes <= limit with a plain (unsegmented) sieve; used for the base primes."""
+    if limit < 3:
+        return np.zeros(0, dtype=np.int64)
+    odd = np.ones((limit - 1) // 2, dtype=bool)  # odd[i] <=> 2i + 3
+    for i in range((int(limit**0.5) - 1) // 2):
+        if odd[i]:
+            q = 2 * i + 3
+            odd[(q * q - 3) // 2::q] = False
+    return 2 * np.flatnonzero(odd).astype(np.int64) + 3
+
+
+class PrimeSieve:
+    """
+    Bit-packed odd-only sieve of every number <= limit.
+
+    Use is_prime() for lookups (scalars or arrays) and primes() for ranges.
+    """
+
+    def __init__(self, limit):
+        self.limit = max(int(limit), 2)
+        odds = self.limit // 2 + 1  # odd numbers 1, 3, ..., covering limit
+        base = _small_odd_primes(int(self.limit**0.5) + 1)
+        packed = np.zeros((odds + 7) // 8, dtype=np.uint8)
+
+        for low in range(0, odds, SEGMENT_ODDS):
+            high = min(low + SEGMENT_ODDS, odds)
+            # segment[i] <=> 2 (low + i) + 1 is prime
+            segment = np.ones(high - low, dtype=bool)
+            first = 2 * low + 1
+            for q in base:
+                q = int(q)
+                start = max(q * q, (first + q - 1) // q * q)
+                if start % 2 == 0:
+                    start += q
+                if start > 2 * high - 1:
+                    if q * q > 2 * high - 1:
+                        break
+                    continue
+                segment[(start - first) // 2::q] = False
+            if low == 0:
+                segment[0] = False  # 1 is not prime
+            # Segments are multiples of 8 odds long, so each fills whole bytes
+            packed[low // 8:(high + 7) // 8] = np.packbits(segment, bitorder="little")
+        self.bits = packed
+
+    def is_prime(self, n):
+        """Primality of n (an int or an integer array) with every value <= limit."""
+        n = np.asarray(n, dtype=np.int64)
+        if n.size and n.max() > self.limit:
+            raise ValueError(f"{int(n.max())} exceeds the sieve limit {self.limit}")
+        odd = n & 1 == 1
+        i = np.where(odd & (n > 0), n >> 1, 0)
+        result = ((self.bits[i >> 3] >> (i & 7).astype(np.uint8)) & 1).astype(bool) & odd
+        result |= n == 2
+        return bool(result) if result.ndim == 0 else result
+
+    def __contains__(self, n):
+        return self.is_prime(n)
+
+    def primes(self, start=2, stop=None):
+        """Primes p with start <= p <= stop (default: the sieve limit), as an int64 array."""
+        stop = self.limit if stop is None else min(stop, self.limit)
+        if stop < max(start, 2):
+            return np.zeros(0, dtype=np.int64)
+        lo = max(start, 1) // 2
+        hi = stop // 2 + 1 if stop % 2 else stop // 2
+        flags = np.unpackbits(self.bits[lo // 8:(hi + 7) // 8], bitorder="little")
+        flags = flags[lo % 8:lo % 8 + hi - lo].astype(bool)
+        odd_primes = 2 * (np.flatnonzero(flags) + lo) + 1
+        odd_primes = odd_primes[odd_primes >= start]
+        if start <= 2:
+            return np.concatenate([[2], odd_primes]).astype(np.int64)
+        return odd_primes.astype(np.int64)
+
+
+def miller_rabin(n):
+    """Deterministic primality test for a Python int n < 3.3 * 10^24."""
+    if n < 2:
+        return False
+    for q in _MR_BASES:
+        if n % q == 0:
+            return n == q
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _MR_BASES:
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+_shared = None
+
+
+def sieve(limit):
+    """Return a shared PrimeSieve covering at least limit (rebuilt at double size when needed)."""
+    global _shared
+    if _shared is None or _shared.limit < limit:
+        size = limit if _shared is None else max(limit, 2 * _shared.limit)
+        _shared = PrimeSieve(min(max(size, 1 << 16), max(SIEVE_LIMIT, limit)))
+    return _shared
+
+
+def is_prime(n):
+    """Primality of the integer n: a sieve lookup up to SIEVE_LIMIT, Miller-Rabin beyond."""
+    n = int(n)
+    if n > SIEVE_LIMIT:
+        return miller_rabin(n)
+    return sieve(n).is_prime(n)
+
+
+def primes_up_to(max_p):
+    """All primes <= max_p as an int64 array."""
+    return sieve(max_p).primes(2, max_p)
+
+
+def odd_primes_up_to(max_p):
+    """All odd primes <= max_p as an int64 array."""
+    return sieve(max_p).primes(3, max_p)
+
+
+def twin_primes(max_p):
+    """The primes p <= max_p for which p + 2 is prime too (lower twin members)."""
+    s = sieve(max_p + 2)
+    p = s.primes(3, max_p)
+    return p[s.is_prime(p + 2)]
@@ -1,5 +1,6 @@
 
-import pandas as pd
+from dataset import read_dataset
+from summary_stats import load_summary
 
 def print_cardinality_2_indices():
     """
@@ -9,21 +10,26 @@ def print_cardinality_2_indices():
     print("--- Indices 'n' Resulting in Cardinality 2 ---\n")
     
     try:
-        df = pd.read_csv("../../data/reversed_dickson_values.csv")
+        # The summary written by Test.py already lists the indices of every prime
+        summary = load_summary()
+        indices = {p: summary.indices(p, 2) for p in summary.primes}
     except FileNotFoundError:
-        print("Error: 'data/reversed_dickson_values.csv' not found. Please run the data generation script (scripts/data_generation/Test.py) first.")
-        return
+        try:
+            # Legacy CSV: only rows where the cardinality is 2 are read
+            cardinality_2_df = read_dataset(["p", "n"], value_count=2)
+        except FileNotFoundError:
+            print("Error: dataset 'data/reversed_dickson_values' not found. Please run the data generation script (scripts/data_generation/Test.py) first.")
+            return
+        indices = {p: group['n'].tolist() for p, group in cardinality_2_df.groupby('p')}
 
-    # Filter the DataFrame for rows where the cardinality is 2
-    cardinality_2_df = df[df["value_count"] == 2]
-    
-    if cardinality_2_df.empty:
+    indices = {p: n_values for p, n_values in indices.items() if n_values}
+    if not indices:
         print("No instances with a cardinality of 2 were found in the dataset.")
         return
 
-    # Group the results by prime 'p' and print the indices 'n'
-    for p, group in cardinality_2_df.groupby('p'):
-        n_values = sorted(group['n'].tolist())
+    # Print the indices 'n' grouped by prime 'p'
+    for p, n_values in indices.items():
+        n_values = sorted(n_values)
         print(f"Prime p = {p}:")
         print(f"  Indices n = {n_values}\n")
 
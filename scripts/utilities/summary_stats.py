@@ -0,0 +1,201 @@
+"""
+Summary statistics of the reversed Dickson dataset, accumulated while it is
+generated.
+
+Test.py feeds every block of a prime's table to a PrimeSummary as the shard
+is written, so the statistics cost one pass over value_count that the
+generation already makes.  Each shard keeps its own summary.json, and
+write_summary() merges them into one small file next to the manifest:
+
+    data/reversed_dickson_values/summary.json
+
+For every prime it records
+
+    rows                    indices n stored
+    value_count_histogram   h[k] = number of n with value_count k, k = 0..p
+    min/max/mean_value_count
+    permutation_indices     the n with value_count p
+    cardinality_indices     the n with value_count k, for k = 1..SUMMARY_MAX_CARDINALITY
+
+so questions such as "which n give cardinality 2" or "how many permutations
+are there for p" never touch the table itself:
+
+    summary = load_summary()
+    summary.indices(97, 2)          # [4705, 4801, 9408]
+    summary.histogram(97)           # int64 array of p + 1 counts
+
+Shards written before summaries existed are summarized from their
+value_count column, streamed in chunks.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from dataset import DEFAULT_DATASET, read_manifest, read_prime_columns, shard_dir
+
+SUMMARY_FILE = "summary.json"
+SUMMARY_FORMAT = "reversed-dickson-summary"
+SUMMARY_VERSION = 1
+
+# Index lists are kept for value_count 1..SUMMARY_MAX_CARDINALITY (a handful of n per prime)
+SUMMARY_MAX_CARDINALITY = 8
+
+# value_count entries read at a time when summarizing an existing shard
+SUMMARY_CHUNK = 1 << 22
+
+
+class PrimeSummary:
+    """
+    Online accumulator of one prime's statistics.
+
+        summary = PrimeSummary(p)
+        for block in blocks:
+            summary.update(block["n"], block["value_count"])
+        summary.to_dict()
+    """
+
+    def __init__(self, p, max_cardinality=SUMMARY_MAX_CARDINALITY):
+        self.p = p
+        self.max_cardinality = max_cardinality
+        self.histogram = np.zeros(p + 1, dtype=np.int64)
+        self.permutations = []
+        self.indices = {k: [] for k in range(1, max_cardinality + 1)}
+
+    def update(self, n, value_count):
+        """Add a block: n and value_count are equally long 1-D arrays."""
+        n = np.asarray(n)
+        value_count = np.asarray(value_count)
+        counts = np.bincount(value_count, minlength=self.p + 1)
+        self.histogram += counts
+        # Only scan the block for the cardinalities it contains
+        if counts[self.p]:
+            self.permutations.append(n[value_count == self.p])
+        for k, found in self.indices.items():
+            if k <= self.p and counts[k]:
+                found.append(n[value_count == k])
+
+    @property
+    def rows(self):
+        return int(self.histogram.sum())
+
+    def to_dict(self):
+        present = np.flatnonzero(self.histogram)
+        rows = self.rows
+        return {
+            "p": self.p,
+            "rows": rows,
+            "min_value_count": int(present[0]) if rows else None,
+            "max_value_count": int(present[-1]) if rows else None,
+            "mean_value_count": float(self.histogram @ np.arange(self.p + 1)) / rows if rows else None,
+            "value_count_histogram": self.histogram.tolist(),
+            "permutation_indices": _join(self.permutations),
+            "max_cardinality": self.max_cardinality,
+            "cardinality_indices": {str(k): _join(found) for k, found in self.indices.items()},
+        }
+
+
+def _join(arrays):
+    return np.concatenate(arrays).tolist() if arrays else []
+
+
+def summarize_shard(path, p):
+    """PrimeSummary of a shard without a summary.json, from its value_count column."""
+    columns = read_prime_columns(path, p, ["n", "value_count"])
+    summary = PrimeSummary(p)
+    for start in range(0, len(columns["n"]), SUMMARY_CHUNK):
+        summary.update(columns["n"][start:start + SUMMARY_CHUNK],
+                       columns["value_count"][start:start + SUMMARY_CHUNK])
+    return summary.to_dict()
+
+
+def read_shard_summary(path, p):
+    """Summary dict of prime p's shard (computed from the columns for older shards)."""
+    target = os.path.join(shard_dir(path, p), SUMMARY_FILE)
+    if not os.path.exists(target):
+        return summarize_shard(path, p)
+    with open(target) as f:
+        return json.load(f)
+
+
+def write_summary(path=DEFAULT_DATASET):
+    """
+    Merge the shard summaries of the dataset at path into path/summary.json,
+    replaced atomically; returns the merged dict.
+    """
+    manifest = read_manifest(path)
+    primes = {str(p): read_shard_summary(path, p) for p in manifest["primes"]}
+    rows = sum(s["rows"] for s in primes.values())
+    summary = {
+        "format": SUMMARY_FORMAT,
+        "version": SUMMARY_VERSION,
+        "n_stop": manifest.get("n_stop"),
+        "rows": rows,
+        "min_value_count": min((s["min_value_count"] for s in primes.values() if s["rows"]), default=None),
+        "max_value_count": max((s["max_value_count"] for s in primes.values() if s["rows"]), default=None),
+        "mean_value_count": sum(s["mean_value_count"] * s["rows"] for s in primes.values() if s["rows"]) / rows
+        if rows else None,
+        "primes": primes,
+    }
+    target = os.path.join(path, SUMMARY_FILE)
+    with open(target + ".tmp", "w") as f:
+        json.dump(summary, f)
+    os.replace(target + ".tmp", target)
+    return summary
+
+
+class DatasetSummary:
+    """Read access to a merged summary.json."""
+
+    def __init__(self, data):
+        self.data = data
+        self.primes = sorted(int(p) for p in data["primes"])
+
+    def __contains__(self, p):
+        return str(p) in self.data["primes"]
+
+    def __getitem__(self, p):
+        """The summary dict of prime p."""
+        return self.data["primes"][str(p)]
+
+    def histogram(self, p):
+        """value_count histogram of p: entry k counts the n with value_count k."""
+        return np.array(self[p]["value_count_histogram"], dtype=np.int64)
+
+    def permutations(self, p):
+        """Indices n for which D_n(1, x) permutes F_p."""
+        return self[p]["permutation_indices"]
+
+    def indices(self, p, k):
+        """
+        Indices n of prime p with value_count k.  Raises ValueError when some
+        n has that value_count but k is above the recorded max_cardinality
+        (and is not p itself).
+        """
+        entry = self[p]
+        if k == p:
+            return entry["permutation_indices"]
+        if 1 <= k <= entry["max_cardinality"]:
+            return entry["cardinality_indices"][str(k)]
+        if k < 1 or k > p or entry["value_count_histogram"][k] == 0:
+            return []
+        raise ValueError(f"the summary keeps index lists for value_count <= {entry['max_cardinality']}, "
+                         f"not {k}; read the dataset instead")
+
+
+def load_summary(path=None):
+    """
+    The summary of the binary dataset at path (default DEFAULT_DATASET),
+    rebuilt first when missing or when the manifest lists other primes.
+    Raises FileNotFoundError when there is no binary dataset.
+    """
+    path = DEFAULT_DATASET if path is None else path
+    manifest = read_manifest(path)
+    target = os.path.join(path, SUMMARY_FILE)
+    if os.path.exists(target):
+        with open(target) as f:
+            data = json.load(f)
+        if data.get("format") == SUMMARY_FORMAT and sorted(int(p) for p in data["primes"]) == manifest["primes"]:
+            return DatasetSummary(data)
+    return DatasetSummary(write_summary(path))
@@ -0,0 +1,179 @@
+"""
+Persistent cache of Dickson value sets, shared by the analysis and
+verification scripts.
+
+Every script that looks at the cardinality-2 indices recomputes the same
+value sets for the same (p, n) on every run.  ValueSetCache stores them in
+one SQLite file under data/cache/, keyed by
+
+    (kind, p, n, a, engine_version)
+
+where kind is "dickson" for D_n(x, a) or "reversed" for D_n(a, x), and
+engine_version is dickson_eval.ENGINE_VERSION, so a change to the evaluator
+never serves stale results.  A value set is stored bit-packed (see
+value_set_masks.py), about p / 8 bytes.  Every hit refreshes the entry's
+last-use stamp, and once the stored masks exceed max_bytes the least
+recently used entries are deleted.
+
+    from value_set_cache import cached_value_set
+    values = cached_value_set("reversed", n, p)   # sorted list of ints
+
+The database runs in WAL mode, so several worker processes may share it.
+Set DICKSON_VALUE_SET_CACHE to another file to relocate the cache, or to
+"off" to disable it.
+"""
+
+import os
+import sqlite3
+
+import numpy as np
+
+from dataset import DATA_DIR
+from dickson_eval import ENGINE_VERSION, dickson_values, reversed_dickson_values
+from value_set_masks import mask_values, pack_presence
+
+DEFAULT_CACHE = os.path.join(DATA_DIR, "cache", "value_sets.sqlite")
+
+# Total size of the stored masks before least recently used entries are evicted
+DEFAULT_MAX_BYTES = 256 << 20
+
+KINDS = {
+    "dickson": dickson_values,
+    "reversed": reversed_dickson_values,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS value_sets (
+    kind TEXT NOT NULL,
+    p INTEGER NOT NULL,
+    n TEXT NOT NULL,
+    a INTEGER NOT NULL,
+    engine INTEGER NOT NULL,
+    mask BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (kind, p, n, a, engine)
+);
+CREATE INDEX IF NOT EXISTS value_sets_last_used ON value_sets (last_used);
+"""
+
+
+class ValueSetCache:
+    """
+    SQLite-backed LRU cache of value sets over F_p.
+
+    n is stored as text, so indices beyond 64 bits are fine; a is reduced mod p.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM value_sets").fetchone()[0]
+
+    def total_bytes(self):
+        """Size of all stored masks in bytes."""
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM value_sets").fetchone()[0]
+
+    def _key(self, kind, p, n, a):
+        if kind not in KINDS:
+            raise ValueError(f"unknown kind {kind!r} (expected one of {sorted(KINDS)})")
+        return kind, int(p), str(int(n)), int(a) % int(p), ENGINE_VERSION
+
+    def _next_stamp(self):
+        return self.conn.execute("SELECT COALESCE(MAX(last_used), 0) + 1 FROM value_sets").fetchone()[0]
+
+    def get(self, kind, n, p, a=1):
+        """Sorted values of the cached value set, or None on a miss."""
+        key = self._key(kind, p, n, a)
+        with self.conn:
+            row = self.conn.execute(
+                "SELECT mask FROM value_sets WHERE kind = ? AND p = ? AND n = ? AND a = ? AND engine = ?",
+                key).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE value_sets SET last_used = ? "
+                "WHERE kind = ? AND p = ? AND n = ? AND a = ? AND engine = ?",
+                (self._next_stamp(),) + key)
+        mask = np.frombuffer(row[0], dtype="<u8").astype(np.uint64)
+        return mask_values(mask, int(p))
+
+    def put(self, kind, n, p, values, a=1):
+        """Store the value set given as an iterable of values in [0, p), then evict down to max_bytes."""
+        key = self._key(kind, p, n, a)
+        presence = np.zeros((1, int(p)), dtype=bool)
+        presence[0, np.fromiter(values, dtype=np.int64)] = True
+        mask = pack_presence(presence)[0].astype("<u8").tobytes()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO value_sets VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (mask, len(mask), self._next_stamp()))
+            self._evict()
+
+    def _evict(self):
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for rowid, size in self.conn.execute("SELECT rowid, size FROM value_sets ORDER BY last_used"):
+            victims.append((rowid,))
+            excess -= size
+            if excess <= 0:
+                break
+        self.conn.executemany("DELETE FROM value_sets WHERE rowid = ?", victims)
+
+    def value_set(self, kind, n, p, a=1, backend="lucas"):
+        """Sorted values of D_n over F_p: from the cache, or computed and stored on a miss."""
+        values = self.get(kind, n, p, a)
+        if values is None:
+            values = np.unique(KINDS[kind](n, p, a, backend=backend)).tolist()
+            self.put(kind, n, p, values, a)
+        return values
+
+    def clear(self):
+        """Delete every entry, of every engine version."""
+        with self.conn:
+            self.conn.execute("DELETE FROM value_sets")
+
+
+_shared = None
+
+
+def default_cache():
+    """
+    The cache at DICKSON_VALUE_SET_CACHE (default DEFAULT_CACHE), opened once
+    per process; None when the variable is "off".
+    """
+    global _shared
+    path = os.environ.get("DICKSON_VALUE_SET_CACHE", DEFAULT_CACHE)
+    if path == "off":
+        return None
+    if _shared is None or _shared.path != path:
+        _shared = ValueSetCache(path)
+    return _shared
+
+
+def cached_value_set(kind, n, p, a=1, backend="lucas"):
+    """Sorted values of D_n over F_p, going through default_cache() when enabled."""
+    cache = default_cache()
+    if cache is None:
+        return np.unique(KINDS[kind](n, p, a, backend=backend)).tolist()
+    return cache.value_set(kind, n, p, a, backend)
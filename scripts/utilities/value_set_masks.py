@@ -0,0 +1,89 @@
+"""
+Bit-packed value sets.
+
+A value set S of F_p is stored as ceil(p / 64) uint64 words: bit v % 64 of
+word v // 64 is set iff v is in S.  A table of value sets is a (rows, words)
+uint64 array, i.e. about p / 8 bytes per row instead of a Python list of up
+to p ints (about 28 bytes per element) or a comma-joined string.
+
+Cardinality is a popcount and membership is a single bit test, so most
+questions about a value set never need to unpack it.
+"""
+
+import numpy as np
+
+# Rows unpacked at a time when converting to and from the CSV form, so the
+# (rows, p) bool matrix never covers a whole table
+FORMAT_CHUNK_ROWS = 4096
+
+# Popcount of every byte, for NumPy versions without np.bitwise_count
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+def words_for(p):
+    """Number of uint64 words per value set over F_p."""
+    return (p + 63) // 64
+
+
+def pack_presence(presence):
+    """
+    Pack a (rows, p) bool presence matrix into a (rows, words_for(p)) uint64 array.
+    """
+    rows, p = presence.shape
+    packed = np.zeros((rows, words_for(p) * 8), dtype=np.uint8)
+    packed[:, :(p + 7) // 8] = np.packbits(presence, axis=1, bitorder="little")
+    return packed.view("<u8").astype(np.uint64, copy=False)
+
+
+def unpack_masks(masks, p):
+    """Inverse of pack_presence(): return the (rows, p) bool presence matrix."""
+    masks = np.atleast_2d(masks)
+    as_bytes = np.ascontiguousarray(masks, dtype="<u8").view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1, count=p, bitorder="little").astype(bool)
+
+
+def popcount(masks):
+    """Cardinality of each value set (sum of set bits along the last axis)."""
+    masks = np.asarray(masks, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks).sum(axis=-1, dtype=np.int64)
+    as_bytes = np.ascontiguousarray(masks, dtype="<u8").view(np.uint8)
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1)
+
+
+def contains(masks, v):
+    """Bool array: does each value set contain the value v?"""
+    masks = np.asarray(masks, dtype=np.uint64)
+    word = masks[..., v >> 6]
+    return ((word >> np.uint64(v & 63)) & np.uint64(1)).astype(bool)
+
+
+def mask_values(mask, p):
+    """Sorted values of a single value set, as a list of ints."""
+    return np.flatnonzero(unpack_masks(mask, p)[0]).tolist()
+
+
+def format_values(masks, p):
+    """Comma-joined value lists, one string per row (the CSV 'values' column)."""
+    masks = np.atleast_2d(masks)
+    strings = []
+    for start in range(0, len(masks), FORMAT_CHUNK_ROWS):
+        presence = unpack_masks(masks[start:start + FORMAT_CHUNK_ROWS], p)
+        strings.extend(",".join(map(str, np.flatnonzero(row).tolist())) for row in presence)
+    return strings
+
+
+def parse_values(strings, p):
+    """Pack comma-joined value lists (e.g. read back from CSV) into masks."""
+    strings = list(strings)
+    masks = np.zeros((len(strings), words_for(p)), dtype=np.uint64)
+    for start in range(0, len(strings), FORMAT_CHUNK_ROWS):
+        chunk = strings[start:start + FORMAT_CHUNK_ROWS]
+        presence = np.zeros((len(chunk), p), dtype=bool)
+        for i, s in enumerate(chunk):
+            if isinstance(s, str) and s:
+                presence[i, [int(v) for v in s.split(",")]] = True
+            elif not isinstance(s, str):
+                presence[i, int(s)] = True
+        masks[start:start + len(chunk)] = pack_presence(presence)
+    return masks
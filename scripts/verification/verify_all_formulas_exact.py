@@ -1,7 +1,12 @@
-import pandas as pd
+import os
+import sys
 from math import sqrt
 from collections import defaultdict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from cardinality_matrix import load_cardinality_matrix
+from dataset import read_dataset
+
 # Exact closed-form formulas
 # For odd primes p > 3
 
@@ -34,14 +39,13 @@ def exact_rmse(actual, predicted):
 
 def main():
     try:
-        df = pd.read_csv("../../data/reversed_dickson_values_by_cardinality.csv")
+        # Use only value_count == 2 (filtered while reading, only p and n loaded)
+        card2 = read_dataset(["p", "n"], value_count=2)
+        matrix = load_cardinality_matrix()
     except FileNotFoundError:
-        print("Error: 'data/reversed_dickson_values_by_cardinality.csv' not found. Run scripts/data_generation/Test.py first.")
+        print("Error: dataset 'data/reversed_dickson_values' not found. Run scripts/data_generation/Test.py first.")
         return
 
-    # Use only value_count == 2
-    card2 = df[df["value_count"] == 2].copy()
-
     # Group actual n's by p
     by_p = defaultdict(list)
     for _, row in card2.iterrows():
@@ -62,23 +66,29 @@ def main():
         if p <= 3:
             continue
 
-        expected_set = {f1(p), f2(p), f3(p)}
+        # A dataset generated with --n-stop may stop before the formula indices;
+        # indices beyond the stored range count as missing
+        stored = matrix.rows(p)
+        expected_set = {n for n in (f1(p), f2(p), f3(p)) if n < stored}
         actual_set = set(ns)
 
         if actual_set != expected_set:
             mismatches.append((p, sorted(actual_set), sorted(expected_set)))
         
-        # Append per-pattern pairs only if the formula value is present in actual
+        # Append per-pattern pairs only if value_count is 2 at the formula value,
+        # read directly from the cardinality matrix
         n1 = f1(p)
         n2 = f2(p)
         n3 = f3(p)
-        if n1 in actual_set:
+        in_range = [n for n in (n1, n2, n3) if n < stored]
+        at_formulas = dict(zip(in_range, matrix[p, in_range].tolist()))
+        if at_formulas.get(n1) == 2:
             patt1_actual.append(n1)
             patt1_pred.append(n1)
-        if n2 in actual_set:
+        if at_formulas.get(n2) == 2:
             patt2_actual.append(n2)
             patt2_pred.append(n2)
-        if n3 in actual_set:
+        if at_formulas.get(n3) == 2:
             patt3_actual.append(n3)
             patt3_pred.append(n3)
 
@@ -1,5 +1,9 @@
 
-import pandas as pd
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dataset import PrimeIndex, read_dataset
 
 def verify_cardinality_2_patterns():
     """
@@ -8,13 +12,13 @@ def verify_cardinality_2_patterns():
     print("Verifying patterns for indices 'n' where cardinality is 2...\n")
     
     try:
-        df = pd.read_csv("../../data/reversed_dickson_values.csv")
+        cardinality_2_df = read_dataset(["p", "n", "value_count"], value_count=2)
     except FileNotFoundError:
-        print("Error: 'data/reversed_dickson_values.csv' not found. Please run the data generation script first.")
+        print("Error: dataset 'data/reversed_dickson_values' not found. Please run the data generation script first.")
         return
 
-    cardinality_2_df = df[df["value_count"] == 2]
-    primes = sorted(cardinality_2_df["p"].unique())
+    by_prime = PrimeIndex(cardinality_2_df)
+    primes = by_prime.primes
 
     if not primes:
         print("No instances with cardinality 2 found in the data.")
@@ -23,7 +27,7 @@ def verify_cardinality_2_patterns():
     for p in primes:
         print(f"--- Verifying for prime p = {p} ---")
         
-        n_values = sorted(cardinality_2_df[cardinality_2_df["p"] == p]["n"].tolist())
+        n_values = sorted(by_prime.column(p, "n").tolist())
         print(f"  Observed n values: {n_values}")
 
         # --- Verification 1: The (p^2 + 1) / 2 formula ---
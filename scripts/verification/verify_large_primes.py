@@ -0,0 +1,129 @@
+"""
+Verify the three cardinality-2 formulas for every prime up to a bound.
+
+verify_value_sets.py prints a detailed report for a handful of primes; this
+script checks n = p² - 1, (p² + 1)/2 and (p² + 2p - 1)/2 against their
+predicted value sets {1, 2}, {1, p-1}, {1, p-1} for every prime
+5 <= p <= --max-prime, across a process pool.
+
+Each value set is computed exactly over all of F_p with the fp2 backend of
+dickson_eval.py: the roots of t^2 - t + x are found once per prime, and
+with the exponent reduced by the group orders every power is O(log p), so
+one prime costs O(p log p) vectorized work.  The value sets bypass
+value_set_cache.py: three entries per prime would only evict the ones the
+analysis scripts reuse.
+
+Reports throughput in primes per second and lists every counterexample;
+the exit status is 1 when there is one.
+
+Usage: python verify_large_primes.py [--max-prime P] [--min-prime P] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dickson_eval import reversed_dickson_values
+from primes import odd_primes_up_to
+from verify_value_sets import special_cases
+
+# Primes handed to a worker at a time
+CHUNK_PRIMES = 16
+
+# Seconds between progress lines
+PROGRESS_INTERVAL = 10.0
+
+
+def observed_value_set(n, p):
+    """Value set of D_n(1, x) over F_p as a sorted list (presence by bincount, O(p))."""
+    values = reversed_dickson_values(n, p, backend="fp2")
+    return np.flatnonzero(np.bincount(values, minlength=p)).tolist()
+
+
+def check_prime(p):
+    """
+    Check the three cardinality-2 indices for p.
+
+    Returns (p, counterexamples) with one (label, n, observed, expected)
+    tuple per index whose value set differs from the prediction.
+    """
+    counterexamples = []
+    for label, n, expected in special_cases(p):
+        observed = observed_value_set(n, p)
+        if set(observed) != expected:
+            counterexamples.append((label, n, observed, sorted(expected)))
+    return p, counterexamples
+
+
+def verify(primes, workers):
+    """Check every prime in primes and return the list of (p, counterexamples) failures."""
+    failures = []
+    start = last_report = time.perf_counter()
+
+    def progress(done, p):
+        nonlocal last_report
+        now = time.perf_counter()
+        if now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            print(f"  {done}/{len(primes)} primes (up to p = {p}), {done / (now - start):.1f} primes/s")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(check_prime, primes, chunksize=CHUNK_PRIMES)
+            for done, (p, counterexamples) in enumerate(results, 1):
+                if counterexamples:
+                    failures.append((p, counterexamples))
+                progress(done, p)
+    else:
+        for done, p in enumerate(primes, 1):
+            _, counterexamples = check_prime(p)
+            if counterexamples:
+                failures.append((p, counterexamples))
+            progress(done, p)
+
+    elapsed = time.perf_counter() - start
+    rate = len(primes) / elapsed if elapsed > 0 else float("inf")
+    print(f"Checked {len(primes)} primes in {elapsed:.1f} s ({rate:.1f} primes/s, {3 * rate:.1f} value sets/s)")
+    return failures
+
+
+def format_values(values, limit=10):
+    if len(values) <= limit:
+        return str(values)
+    return f"[{', '.join(map(str, values[:limit]))}, ...] ({len(values)} values)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the cardinality-2 formulas for every prime up to a bound.")
+    parser.add_argument("--max-prime", type=int, default=10**4, help="largest prime to check (default: 10^4)")
+    parser.add_argument("--min-prime", type=int, default=5, help="smallest prime to check (default: 5)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: all CPUs)")
+    args = parser.parse_args()
+
+    if args.max_prime >= 2**31:
+        parser.error("--max-prime must stay below 2^31 (int64 arithmetic over F_p)")
+    primes = odd_primes_up_to(args.max_prime)
+    primes = primes[primes >= max(args.min_prime, 5)].tolist()
+    print(f"Verifying {len(primes)} primes in [{max(args.min_prime, 5)}, {args.max_prime}] "
+          f"with {args.workers} worker(s)...")
+
+    failures = verify(primes, args.workers)
+    if not failures:
+        print("All three formulas hold for every prime checked ✓")
+        return 0
+
+    print(f"\n{len(failures)} prime(s) with counterexamples ✗")
+    for p, counterexamples in failures:
+        for label, n, observed, expected in counterexamples:
+            print(f"  p = {p}, {label} = {n}: value set {format_values(observed)}, expected {expected}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
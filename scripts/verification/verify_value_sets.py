@@ -8,118 +8,206 @@ For prime p > 3:
 - n₁ = p² - 1 should give value set {1, 2}
 - n₂ = (p² + 1)/2 should give value set {1, p-1}
 - n₃ = (p² + 2p - 1)/2 should give value set {1, p-1}
+
+For primes far beyond array evaluation (p around 10^9 to 10^18), --sample K
+evaluates each index at K random x instead of all of F_p, with big-integer
+lucas_v() (gmpy2 integers when gmpy2 is installed).  Any value outside the
+prediction is a definite counterexample; when there is none, the report
+gives an upper confidence bound on the fraction of F_p that could still
+map outside the predicted set.
 """
 
+import argparse
+import math
+import os
+import random
+import sys
+from collections import Counter
+from statistics import NormalDist
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dickson_eval import lucas_v
+from primes import is_prime
+from value_set_cache import cached_value_set
+
+# Primes checked by --sample when none are given
+LARGE_PRIMES = [10**9 + 7, 10**12 + 39, 10**15 + 37, 10**18 + 3]
+
+
 def reversed_dickson_polynomial(n, x, p):
     """
     Compute the REVERSED Dickson polynomial D_n(1, x) mod p.
     
-    This uses the recurrence relation from Test.py:
+    This is the sequence from Test.py:
     D_0(1, x) = 2
     D_1(1, x) = 1
     D_n(1, x) = D_{n-1}(1, x) - x * D_{n-2}(1, x)
+    evaluated in O(log n) steps with the Lucas doubling formulas.
     """
-    if n == 0:
-        return 2 % p
-    if n == 1:
-        return 1 % p
-    
-    # Use iterative approach to avoid recursion depth issues
-    d_prev = 2 % p  # D_0
-    d_curr = 1 % p  # D_1
-    
-    for i in range(2, n + 1):
-        d_next = (d_curr - x * d_prev) % p
-        d_prev = d_curr
-        d_curr = d_next
-    
-    return d_curr
+    return lucas_v(n, 1, x, p)
+
+
+def special_cases(p):
+    """
+    The three cardinality-2 indices for p as (label, n, expected value set).
+    """
+    return [
+        ("n = p² - 1", p**2 - 1, {1, 2}),
+        ("n = (p² + 1)/2", (p**2 + 1) // 2, {1, p - 1}),
+        ("n = (p² + 2p - 1)/2", (p**2 + 2*p - 1) // 2, {1, p - 1}),
+    ]
 
 
-def compute_value_set(n, p):
+def compute_value_set(n, p, backend="lucas"):
     """
     Compute the value set of D_n(1, x) for all x in F_p.
     Returns the set of all distinct outputs.
+
+    backend="lucas" uses the doubling recurrence; backend="fp2" uses the
+    closed form gamma^n + (1 - gamma)^n with the roots gamma precomputed
+    once per prime in F_p or F_{p^2}.  Results are kept in the shared
+    value-set cache (value_set_cache.py), so repeated runs skip the evaluation.
     """
-    value_set = set()
-    for x in range(p):
-        value = reversed_dickson_polynomial(n, x, p)
-        value_set.add(value)
-    return value_set
+    return set(cached_value_set("reversed", n, p, backend=backend))
 
 
-def is_prime(num):
-    """Check if a number is prime."""
-    if num < 2:
-        return False
-    for i in range(2, int(num**0.5) + 1):
-        if num % i == 0:
-            return False
-    return True
+def sample_value_set(n, p, samples, rng):
+    """
+    Evaluate D_n(1, x) mod p at samples uniformly random x in F_p.
+    Returns a Counter of the observed values.
+    """
+    big = gmpy2.mpz if gmpy2 is not None else int
+    one, modulus = big(1), big(p)
+    return Counter(int(lucas_v(n, one, big(rng.randrange(p)), modulus)) for _ in range(samples))
 
 
-def verify_for_prime(p):
+def outside_fraction_bound(samples, confidence):
+    """
+    Upper confidence bound on the fraction of F_p mapping outside the
+    predicted set after samples draws found none: the largest f with
+    (1 - f)^samples >= 1 - confidence (about 3 / samples at 95%).
+    """
+    return 1 - (1 - confidence) ** (1 / samples)
+
+
+def wilson_interval(k, m, confidence):
+    """Wilson score interval for a binomial proportion with k successes in m trials."""
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    centre = (k + z * z / 2) / (m + z * z)
+    half = z * math.sqrt(k * (m - k) / m + z * z / 4) / (m + z * z)
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def sample_for_prime(p, samples, confidence=0.99, seed=None):
+    """
+    Probabilistic check of the three special cases for a (large) prime p,
+    from samples random x per index.  A given seed is combined with p, so
+    every prime draws its own reproducible sample.
+    """
+    print(f"\n{'='*60}")
+    print(f"Prime p = {p} ({samples} random x per index)")
+    print(f"{'='*60}")
+
+    rng = random.Random(None if seed is None else f"{seed}:{p}")
+    all_match = True
+    for label, n, expected in special_cases(p):
+        observed = sample_value_set(n, p, samples, rng)
+        outside = sorted(set(observed) - expected)
+        print(f"\nCase {label}")
+        print(f"  Expected image:  {sorted(expected)}")
+        print(f"  Observed values: {sorted(observed)}")
+        for v in sorted(expected):
+            lo, hi = wilson_interval(observed[v], samples, confidence)
+            print(f"    {v}: {observed[v]}/{samples} samples, share of F_p in [{lo:.4f}, {hi:.4f}]")
+        if outside:
+            print(f"  Counterexample ✗: values outside the prediction: {outside[:10]}")
+            all_match = False
+        else:
+            bound = outside_fraction_bound(samples, confidence)
+            print(f"  No value outside the prediction ✓ "
+                  f"(< {bound:.2e} of F_p could map elsewhere, {confidence:.0%} confidence)")
+
+    print(f"\n{'─'*60}")
+    print(f"All cases consistent: {'✓ PASS' if all_match else '✗ FAIL'}")
+    return all_match
+
+
+def verify_for_prime(p, backend="lucas"):
     """
     Verify the three special cases for a given prime p > 3.
+    Smaller primes are skipped and count as passed.
     """
     if p <= 3:
         print(f"Skipping p={p} (requires p > 3)")
-        return
+        return True
     
     print(f"\n{'='*60}")
     print(f"Prime p = {p}")
     print(f"{'='*60}")
     
-    # Case 1: n = p² - 1, expected value set {1, 2}
-    n1 = p**2 - 1
-    vs1 = compute_value_set(n1, p)
-    expected1 = {1, 2}
-    match1 = vs1 == expected1
-    print(f"\nCase 1: n = p² - 1 = {n1}")
-    print(f"  Value set: {sorted(vs1)}")
-    print(f"  Expected:  {sorted(expected1)}")
-    print(f"  Match: {'✓' if match1 else '✗'}")
-    
-    # Case 2: n = (p² + 1)/2, expected value set {1, p-1}
-    n2 = (p**2 + 1) // 2
-    vs2 = compute_value_set(n2, p)
-    expected2 = {1, p - 1}
-    match2 = vs2 == expected2
-    print(f"\nCase 2: n = (p² + 1)/2 = {n2}")
-    print(f"  Value set: {sorted(vs2)}")
-    print(f"  Expected:  {sorted(expected2)}")
-    print(f"  Match: {'✓' if match2 else '✗'}")
-    
-    # Case 3: n = (p² + 2p - 1)/2, expected value set {1, p-1}
-    n3 = (p**2 + 2*p - 1) // 2
-    vs3 = compute_value_set(n3, p)
-    expected3 = {1, p - 1}
-    match3 = vs3 == expected3
-    print(f"\nCase 3: n = (p² + 2p - 1)/2 = {n3}")
-    print(f"  Value set: {sorted(vs3)}")
-    print(f"  Expected:  {sorted(expected3)}")
-    print(f"  Match: {'✓' if match3 else '✗'}")
+    all_match = True
+    for case, (label, n, expected) in enumerate(special_cases(p), 1):
+        vs = compute_value_set(n, p, backend)
+        match = vs == expected
+        all_match = all_match and match
+        print(f"\nCase {case}: {label} = {n}")
+        print(f"  Value set: {sorted(vs)}")
+        print(f"  Expected:  {sorted(expected)}")
+        print(f"  Match: {'✓' if match else '✗'}")
     
     # Summary
-    all_match = match1 and match2 and match3
     print(f"\n{'─'*60}")
     print(f"All cases verified: {'✓ PASS' if all_match else '✗ FAIL'}")
     
     return all_match
 
 
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Verify the three cardinality-2 value sets.")
+    parser.add_argument("primes", nargs="*", type=int,
+                        help="primes to check (default: 5 7 11 13 17 19 23 29 31)")
+    parser.add_argument("--backend", choices=["lucas", "fp2"], default="lucas",
+                        help="evaluation backend for D_n(1, x) (default: lucas)")
+    parser.add_argument("--sample", type=positive_int, metavar="K",
+                        help="check K random x per index instead of all of F_p "
+                             "(default primes: 10^9+7, 10^12+39, 10^15+37, 10^18+3)")
+    parser.add_argument("--confidence", type=float, default=0.99,
+                        help="confidence level of the --sample bounds (default: 0.99)")
+    parser.add_argument("--seed", type=int, help="random seed for --sample")
+    args = parser.parse_args()
+
     print("Verification of Dickson Polynomial Value Sets with Cardinality 2")
     print("="*60)
-    
+    if args.sample is not None:
+        print(f"Sampling mode, big integers via {'gmpy2' if gmpy2 is not None else 'Python int'}")
+
     # Test on small primes first
-    test_primes = [5, 7, 11, 13, 17, 19, 23, 29, 31]
+    default_primes = LARGE_PRIMES if args.sample is not None else [5, 7, 11, 13, 17, 19, 23, 29, 31]
+    test_primes = args.primes or default_primes
     
     all_passed = True
     for p in test_primes:
-        if is_prime(p):
-            passed = verify_for_prime(p)
-            all_passed = all_passed and passed
+        if not is_prime(p):
+            print(f"\nError: {p} is not prime")
+            all_passed = False
+            continue
+        if args.sample is not None:
+            passed = sample_for_prime(p, args.sample, args.confidence, args.seed)
+        else:
+            passed = verify_for_prime(p, args.backend)
+        all_passed = all_passed and passed
     
     print(f"\n\n{'='*60}")
     print(f"FINAL RESULT: {'ALL TESTS PASSED ✓' if all_passed else 'SOME TESTS FAILED ✗'}")
@@ -1,7 +1,12 @@
 
-import pandas as pd
+import os
+import sys
+
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from dataset import PrimeIndex, read_dataset
+
 def plot_cardinality_2_indices():
     """
     Creates a scatter plot of indices 'n' that result in cardinality 2,
@@ -10,26 +15,25 @@ def plot_cardinality_2_indices():
     print("Generating plot for indices 'n' where cardinality is 2...")
     
     try:
-        df = pd.read_csv("../../data/reversed_dickson_values.csv")
+        cardinality_2_df = read_dataset(["p", "n", "value_count"], value_count=2)
     except FileNotFoundError:
-        print("Error: 'data/reversed_dickson_values.csv' not found. Please run the data generation script (scripts/data_generation/Test.py) first.")
+        print("Error: dataset 'data/reversed_dickson_values' not found. Please run the data generation script (scripts/data_generation/Test.py) first.")
         return
 
-    cardinality_2_df = df[df["value_count"] == 2]
     
     if cardinality_2_df.empty:
         print("No instances with a cardinality of 2 were found.")
         return
 
-    primes = sorted(cardinality_2_df['p'].unique())
+    by_prime = PrimeIndex(cardinality_2_df)
     
     # Lists to hold data for each pattern
     pattern1_p, pattern1_n = [], []  # n = (p^2 + 1) / 2
     pattern2_p, pattern2_n = [], []  # n = k * (p^2 - 1) / 2
     pattern3_p, pattern3_n = [], []  # The "third n"
 
-    for p in primes:
-        n_values = set(cardinality_2_df[cardinality_2_df["p"] == p]["n"].tolist())
+    for p in by_prime.primes:
+        n_values = set(by_prime.column(p, "n").tolist())
         
         # Identify and categorize each n
         n1 = (p**2 + 1) / 2
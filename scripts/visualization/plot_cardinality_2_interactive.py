@@ -1,13 +1,157 @@
-import pandas as pd
+"""
+Interactive plots of the reversed Dickson dataset.
+
+By default: the cardinality-2 indices n against p, one trace per formula.
+
+With --all: a large-data explorer of value_count against n for every (p, n)
+in the dataset.  The HTML holds no data; it reads tiles from a binary sidecar
+(density_tiles.py) as the view changes.  Zoomed out, it draws a density
+heatmap assembled from the tiles of the matching zoom level.  Once the
+visible leaf tiles hold at most --max-points points, it draws those points
+as a WebGL (Scattergl) trace coloured by p.  Only the tiles in view are
+fetched, with HTTP Range requests, so 10^7 points stay responsive.  Browsers
+refuse fetch() from file:// pages, so serve the output directory, e.g.
+
+    cd output/interactive && python -m http.server
+
+and open http://localhost:8000/cardinality_explorer.html.  http.server
+ignores Range headers, in which case the page downloads the sidecar once
+and slices it locally; a server with Range support fetches only the tiles.
+
+Usage: python plot_cardinality_2_interactive.py [--all [--max-points N] [--dataset-dir DIR]]
+"""
+
+import argparse
+import json
+import os
+import sys
+
 import plotly.graph_objects as go
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from cardinality_matrix import load_cardinality_matrix
+from dataset import read_dataset
+from density_tiles import write_density_tiles
+
+INTERACTIVE_DIR = "../../output/interactive"
+
+# Largest number of points the explorer draws individually
+DEFAULT_MAX_POINTS = 200000
+
+# Runs after the explorer figure is created; {plot_id} is filled in by plotly,
+# __SIDECAR__ and __MAX_POINTS__ by build_large_data_explorer().
+EXPLORER_JS = """
+const gd = document.getElementById('{plot_id}');
+const base = __SIDECAR__;
+const MAX_POINTS = __MAX_POINTS__;
+const DTYPES = {int32: Int32Array, uint32: Uint32Array, uint16: Uint16Array};
+
+// Byte range of the sidecar; falls back to one full download when the
+// server ignores Range headers.  The first request is the probe: later
+// requests wait for it, so a server without Range support sends the file
+// once, however many tiles are requested in parallel.
+let probe = null;
+async function bytes(offset, length) {
+  const request = () => fetch(base + '.bin', {headers: {Range: 'bytes=' + offset + '-' + (offset + length - 1)}})
+    .then(r => r.arrayBuffer().then(buf => ({ranged: r.status === 206, buf})));
+  if (probe === null) {
+    probe = request();
+    const first = await probe;
+    if (first.ranged) return first.buf;
+  } else if ((await probe).ranged) {
+    return (await request()).buf;
+  }
+  // The probe got the whole sidecar
+  return (await probe).buf.slice(offset, offset + length);
+}
+
+const cache = new Map();
+function cached(key, load) {
+  if (!cache.has(key)) cache.set(key, load());
+  return cache.get(key);
+}
+
+fetch(base + '.json').then(r => r.json()).then(index => {
+  const T = index.tile, X = index.x_extent, Y = index.y_extent, YB = index.y_bins;
+  const LOG10_STEP = Math.log10(2) / index.log_steps;
+
+  function histTile(level, t) {
+    const offset = index.levels[level].tiles[t];
+    if (offset === undefined) return Promise.resolve(null);
+    return cached('h' + level + ':' + t, () => bytes(offset, T * YB).then(b => new Uint8Array(b)));
+  }
+
+  function column(name, start, count) {
+    const c = index.point_columns[name], Arr = DTYPES[c.dtype];
+    return bytes(c.offset + start * Arr.BYTES_PER_ELEMENT, count * Arr.BYTES_PER_ELEMENT).then(b => new Arr(b));
+  }
 
-def build_and_save_interactive_plot(csv_path="../../data/reversed_dickson_values.csv", out_html="../../output/interactive/cardinality_2_indices_interactive.html"):
-    # Load data
-    df = pd.read_csv(csv_path)
-    df2 = df[df["value_count"] == 2].copy()
+  function leafPoints(leaf) {
+    const [start, count] = index.leaves[leaf];
+    return cached('p' + leaf, () => Promise.all(['n', 'value_count', 'p'].map(k => column(k, start, count))));
+  }
+
+  // Tiles of 2^level equal slices of [0, X) that overlap [x0, x1]
+  function visible(level, x0, x1) {
+    const k = 2 ** level;
+    return [Math.floor(x0 * k / X), Math.min(k - 1, Math.floor(x1 * k / X))];
+  }
+
+  let latest = 0;
+  async function redraw() {
+    const token = ++latest;
+    const xr = gd.layout.xaxis.range;
+    const x0 = Math.max(0, xr[0]), x1 = Math.min(X, xr[1]);
+    if (!(x1 > x0)) return;
+
+    const [l0, l1] = visible(index.leaf_level, x0, x1);
+    const leaves = [];
+    let total = 0;
+    for (let l = l0; l <= l1; l++)
+      if (index.leaves[l]) { leaves.push(l); total += index.leaves[l][1]; }
+    if (total <= MAX_POINTS) {
+      const parts = await Promise.all(leaves.map(leafPoints));
+      if (token !== latest) return;
+      const n = new Float64Array(total), v = new Float64Array(total), p = new Float64Array(total);
+      let at = 0;
+      for (const [pn, pv, pp] of parts) { n.set(pn, at); v.set(pv, at); p.set(pp, at); at += pn.length; }
+      Plotly.restyle(gd, {visible: false}, [0]);
+      Plotly.restyle(gd, {visible: true, x: [n], y: [v], customdata: [p], 'marker.color': [p]}, [1]);
+      return;
+    }
+
+    const level = Math.max(0, Math.min(index.max_level, Math.floor(Math.log2(X / (x1 - x0)))));
+    const [t0, t1] = visible(level, x0, x1);
+    const tiles = [];
+    for (let t = t0; t <= t1; t++) tiles.push(histTile(level, t));
+    const loaded = await Promise.all(tiles);
+    if (token !== latest) return;
+    const cols = (t1 - t0 + 1) * T;
+    const z = Array.from({length: YB}, () => new Array(cols).fill(null));
+    loaded.forEach((h, i) => {
+      if (h === null) return;
+      for (let ix = 0; ix < T; ix++)
+        for (let iy = 0; iy < YB; iy++) {
+          const q = h[ix * YB + iy];
+          if (q) z[iy][i * T + ix] = (q - 1) * LOG10_STEP;
+        }
+    });
+    const dx = X / (2 ** level * T), dy = Y / YB;
+    Plotly.restyle(gd, {visible: true, z: [z], x0: [t0 * T * dx + dx / 2], dx: [dx], y0: [dy / 2], dy: [dy]}, [0]);
+    Plotly.restyle(gd, {visible: false}, [1]);
+  }
+
+  gd.on('plotly_relayout', redraw);
+  redraw();
+});
+"""
+
+
+def build_and_save_interactive_plot(path=None, out_html=os.path.join(INTERACTIVE_DIR, "cardinality_2_indices_interactive.html")):
+    # Load data (only the value_count == 2 rows)
+    df2 = read_dataset(["p", "n"], value_count=2, path=path)
     if df2.empty:
-        print("No rows with value_count == 2 found in", csv_path)
+        print("No rows with value_count == 2 found in the dataset")
         return
 
     # Prepare lists for each pattern
@@ -110,5 +254,48 @@ def build_and_save_interactive_plot(csv_path="../../data/reversed_dickson_values
     print("Saved interactive plot to", out_html)
 
 
+def build_large_data_explorer(dataset_dir=None, out_dir=INTERACTIVE_DIR, name="cardinality_explorer",
+                              max_points=DEFAULT_MAX_POINTS):
+    """
+    Write <name>.html with its <name>.bin / <name>.json tile sidecar to out_dir:
+    value_count against n for every (p, n) of the dataset.
+    """
+    matrix = load_cardinality_matrix(dataset_dir)
+    index = write_density_tiles(matrix, os.path.join(out_dir, name))
+    x_extent, y_extent = index["x_extent"], index["y_extent"]
+
+    fig = go.Figure([
+        go.Heatmap(name="density", z=[[None]], colorscale="Viridis", zsmooth=False,
+                   colorbar=dict(title="log10(indices)"),
+                   hovertemplate="n≈%{x:.0f}<br>value_count≈%{y:.0f}<br>log10(indices)=%{z:.2f}<extra></extra>"),
+        go.Scattergl(name="points", x=[], y=[], mode="markers", visible=False,
+                     marker=dict(size=3, colorscale="Turbo", colorbar=dict(title="p")),
+                     hovertemplate="p=%{customdata}<br>n=%{x}<br>value_count=%{y}<extra></extra>"),
+    ])
+    fig.update_layout(
+        title=f"value_count against n for {len(index['primes'])} primes ({index['points']} points)",
+        xaxis=dict(title="Index n", range=[0, x_extent]),
+        yaxis=dict(title="value_count", range=[0, y_extent]),
+        height=700,
+    )
+
+    out_html = os.path.join(out_dir, name + ".html")
+    script = EXPLORER_JS.replace("__SIDECAR__", json.dumps(name)).replace("__MAX_POINTS__", str(max_points))
+    fig.write_html(out_html, include_plotlyjs='cdn', post_script=script)
+    print("Saved interactive explorer to", out_html)
+    print(f"Serve it over HTTP to view it, e.g.: cd {out_dir} && python -m http.server")
+
+
 if __name__ == '__main__':
-    build_and_save_interactive_plot()
+    parser = argparse.ArgumentParser(description="Interactive plots of the reversed Dickson dataset.")
+    parser.add_argument("--all", action="store_true",
+                        help="write the large-data explorer of value_count for every (p, n)")
+    parser.add_argument("--max-points", type=int, default=DEFAULT_MAX_POINTS,
+                        help=f"largest number of points the explorer draws individually (default: {DEFAULT_MAX_POINTS})")
+    parser.add_argument("--dataset-dir", help="dataset to plot (default: data/reversed_dickson_values)")
+    args = parser.parse_args()
+
+    if args.all:
+        build_large_data_explorer(args.dataset_dir, max_points=args.max_points)
+    else:
+        build_and_save_interactive_plot(args.dataset_dir)
@@ -0,0 +1,119 @@
+"""
+Heatmap of value_count / p over the whole (p, n / p^2) plane.
+
+Every prime's row of the cardinality matrix is streamed once, in chunks, and
+binned onto a fixed raster of --p-bins rows by --n-bins columns: the row is
+the prime's rank (so every prime gets a row when there are at most --p-bins
+of them, and neighbouring primes share one otherwise), the column is
+n / p^2.  Each cell accumulates value_count / p with np.bincount (or, for
+--stat min/max, a reduceat over the runs of equal column, which are
+contiguous because the column grows with n).  Memory is proportional to the
+raster, not to the dataset.
+
+The result is one image, output/plots/cardinality_heatmap.png.  With
+--stat min the cardinality-2 indices show up as dark columns near
+n / p^2 = 1/2 and 1.
+
+Usage: python plot_cardinality_heatmap.py [--stat mean|min|max] [--p-bins N] [--n-bins N]
+"""
+
+import argparse
+import os
+import sys
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from cardinality_matrix import load_cardinality_matrix
+
+OUTPUT_PATH = "../../output/plots/cardinality_heatmap.png"
+
+DEFAULT_P_BINS = 512
+DEFAULT_N_BINS = 1024
+
+# Entries of a row read and binned at a time
+CHUNK = 1 << 22
+
+
+def accumulate_raster(matrix, p_bins=DEFAULT_P_BINS, n_bins=DEFAULT_N_BINS, stat="mean"):
+    """
+    Bin value_count / p of every (p, n) in matrix onto a (rows, n_bins) raster.
+
+    Returns (raster, row_primes, x_max): raster holds the statistic per cell
+    (NaN where no index falls), row_primes[r] is the smallest prime of row r,
+    and the columns span n / p^2 in [0, x_max).
+    """
+    primes = matrix.primes
+    rows = min(p_bins, len(primes))
+    x_max = max(matrix.rows(p) / (p * p) for p in primes)
+    if stat == "mean":
+        sums = np.zeros((rows, n_bins))
+        counts = np.zeros((rows, n_bins), dtype=np.int64)
+    else:
+        raster = np.full((rows, n_bins), np.nan)
+        reduce, combine = (np.minimum, np.fmin) if stat == "min" else (np.maximum, np.fmax)
+
+    row_primes = np.zeros(rows, dtype=np.int64)
+    for rank, p in enumerate(primes):
+        r = rank * rows // len(primes)
+        if row_primes[r] == 0:
+            row_primes[r] = p
+        values = matrix.row(p)
+        scale = n_bins / (x_max * p * p)
+        for start in range(0, len(values), CHUNK):
+            chunk = np.asarray(values[start:start + CHUNK], dtype=np.float64) / p
+            cols = np.minimum(((start + np.arange(len(chunk))) * scale).astype(np.int64), n_bins - 1)
+            if stat == "mean":
+                sums[r] += np.bincount(cols, weights=chunk, minlength=n_bins)
+                counts[r] += np.bincount(cols, minlength=n_bins)
+            else:
+                starts = np.concatenate([[0], np.flatnonzero(np.diff(cols)) + 1])
+                raster[r, cols[starts]] = combine(raster[r, cols[starts]], reduce.reduceat(chunk, starts))
+
+    if stat == "mean":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            raster = sums / counts
+    return raster, row_primes, x_max
+
+
+def render_heatmap(raster, row_primes, x_max, stat, out_path=OUTPUT_PATH):
+    """Write the raster as a PNG heatmap, with the p axis labelled by prime."""
+    rows = len(row_primes)
+    fig, ax = plt.subplots(figsize=(12, 8))
+    image = ax.imshow(raster, origin="lower", aspect="auto", interpolation="nearest", cmap="viridis",
+                      vmin=0, vmax=1, extent=(0, x_max, 0, rows))
+    fig.colorbar(image, ax=ax, label=f"{stat} of value_count / p")
+    ticks = np.unique(np.linspace(0, rows - 1, min(rows, 12)).astype(np.int64))
+    ax.set_yticks(ticks + 0.5)
+    ax.set_yticklabels(row_primes[ticks])
+    ax.set_xlabel("n / p²")
+    ax.set_ylabel("Prime p")
+    ax.set_title(f"Cardinality of the value set of D_n(1, x) over F_p ({stat} per cell)")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Heatmap of value_count / p over the (p, n / p^2) plane.")
+    parser.add_argument("--stat", choices=["mean", "min", "max"], default="mean",
+                        help="statistic of value_count / p per cell (default: mean)")
+    parser.add_argument("--p-bins", type=int, default=DEFAULT_P_BINS,
+                        help=f"raster rows, one per prime up to this many (default: {DEFAULT_P_BINS})")
+    parser.add_argument("--n-bins", type=int, default=DEFAULT_N_BINS,
+                        help=f"raster columns over n / p^2 (default: {DEFAULT_N_BINS})")
+    parser.add_argument("--dataset-dir", help="dataset to plot (default: data/reversed_dickson_values)")
+    parser.add_argument("--out", default=OUTPUT_PATH, help=f"output image (default: {OUTPUT_PATH})")
+    args = parser.parse_args()
+
+    matrix = load_cardinality_matrix(args.dataset_dir)
+    raster, row_primes, x_max = accumulate_raster(matrix, args.p_bins, args.n_bins, args.stat)
+    render_heatmap(raster, row_primes, x_max, args.stat, args.out)
+    print(f"Saved heatmap of {len(matrix.primes)} primes to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,147 @@
+"""
+Scatter plots of value_count against n, one PNG per prime.
 
+Figures are rendered with the Agg backend in a process pool, one prime per
+task; each worker memory-maps the cardinality matrix itself, so only the
+prime number crosses the process boundary.  Without a binary dataset the
+legacy CSV is parsed once, here, and each task carries its prime's row.
+A row of p^2 points is drawn according to --mode:
+
+    full     every point, as before (the default up to --max-points points)
+    minmax   n is split into --bins columns and each column is drawn as the
+             vertical span between its smallest and largest value_count, so
+             isolated extremes (e.g. the cardinality-2 indices) stay visible
+             however many points share a pixel column
+    density  a 2-D histogram of (n, value_count) with a log colour scale
+    auto     full when the row has at most --max-points points, else minmax
+
+Usage: python plot_scatter.py [--mode auto|full|minmax|density] [--workers N] [--primes P ...]
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
-import pandas as pd
-
-# Load the data
-df = pd.read_csv("../../data/reversed_dickson_values.csv")
-
-# Get the unique primes
-primes = df["p"].unique()
-
-# Create a scatter plot for each prime
-for p in primes:
-    prime_data = df[df["p"] == p]
-    plt.figure(figsize=(10, 6))
-    plt.scatter(prime_data["n"], prime_data["value_count"], alpha=0.5)
-    plt.title(f"Cardinality vs. Index (n) for p={p}")
-    plt.xlabel("Index (n)")
-    plt.ylabel("Cardinality of Value Set")
-    plt.grid(True)
-    plt.savefig(f"../../output/plots/scatter_p_{p}.png")
-    plt.close()
-
-print("Scatter plots generated for all primes.")
+import numpy as np
+from matplotlib.colors import LogNorm
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utilities"))
+from cardinality_matrix import load_cardinality_matrix
+
+OUTPUT_DIR = "../../output/plots"
+
+# Rows with more points than this are downsampled in auto mode
+DEFAULT_MAX_POINTS = 20000
+
+# Columns of the minmax and density views (the figure is 1000 px wide)
+DEFAULT_BINS = 1000
+
+# value_count rows of the density view
+DENSITY_LEVELS = 200
+
+_matrix = None
+
+
+def _open_matrix(dataset_dir):
+    global _matrix
+    _matrix = load_cardinality_matrix(dataset_dir)
+
+
+def minmax_envelope(counts, bins):
+    """Start index, min and max of value_count for each of (at most) bins consecutive columns of n."""
+    starts = np.unique(np.linspace(0, len(counts), bins, endpoint=False).astype(np.int64))
+    return starts, np.minimum.reduceat(counts, starts), np.maximum.reduceat(counts, starts)
+
+
+def density_grid(counts, bins, levels=DENSITY_LEVELS):
+    """(bins, levels) histogram of (n, value_count) over a row, and the value_count range it covers."""
+    top = int(counts.max()) + 1
+    levels = min(levels, top)
+    n_bin = np.arange(len(counts), dtype=np.int64) * bins // len(counts)
+    v_bin = counts.astype(np.int64) * levels // top
+    grid = np.bincount(n_bin * levels + v_bin, minlength=bins * levels).reshape(bins, levels)
+    return grid, top
+
+
+def render_prime(p, mode, max_points, bins, output_dir=OUTPUT_DIR, counts=None):
+    """
+    Write scatter_p_{p}.png for one prime; returns p.  counts is the prime's
+    value_count row, by default taken from the matrix opened by _open_matrix().
+    """
+    if counts is None:
+        counts = _matrix.row(p)
+    if mode == "auto":
+        mode = "full" if len(counts) <= max_points else "minmax"
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if mode == "full":
+        ax.scatter(np.arange(len(counts)), counts, alpha=0.5)
+    elif mode == "minmax":
+        starts, lows, highs = minmax_envelope(counts, bins)
+        ax.vlines(starts, lows, highs, linewidth=1, alpha=0.7)
+        ax.scatter(starts, lows, s=4, alpha=0.7)
+        ax.scatter(starts, highs, s=4, alpha=0.7)
+    else:
+        grid, top = density_grid(counts, bins)
+        image = ax.imshow(grid.T, origin="lower", aspect="auto", norm=LogNorm(), interpolation="nearest",
+                          extent=(0, len(counts), 0, top))
+        fig.colorbar(image, ax=ax, label="indices per cell")
+    title = f"Cardinality vs. Index (n) for p={p}"
+    if mode != "full":
+        title += f" ({mode}, {len(counts)} indices)"
+    ax.set_title(title)
+    ax.set_xlabel("Index (n)")
+    ax.set_ylabel("Cardinality of Value Set")
+    ax.grid(True)
+    fig.savefig(os.path.join(output_dir, f"scatter_p_{p}.png"))
+    plt.close(fig)
+    return p
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scatter plots of value_count against n for each prime.")
+    parser.add_argument("--mode", choices=["auto", "full", "minmax", "density"], default="auto",
+                        help="how to draw each row (default: auto)")
+    parser.add_argument("--max-points", type=int, default=DEFAULT_MAX_POINTS,
+                        help=f"largest row drawn point by point in auto mode (default: {DEFAULT_MAX_POINTS})")
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS,
+                        help=f"columns of the minmax and density views (default: {DEFAULT_BINS})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: all CPUs)")
+    parser.add_argument("--primes", nargs="+", type=int, help="plot only these primes")
+    parser.add_argument("--dataset-dir", help="dataset to plot (default: data/reversed_dickson_values)")
+    args = parser.parse_args()
+
+    # Open (and if needed rebuild) the matrix once here, so workers only map it
+    _open_matrix(args.dataset_dir)
+    primes = [p for p in args.primes if p in _matrix] if args.primes else _matrix.primes
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    render = partial(render_prime, mode=args.mode, max_points=args.max_points, bins=args.bins)
+    # Largest primes first, so the slowest figures do not start last
+    order = sorted(primes, reverse=True)
+    if args.workers > 1 and isinstance(_matrix.counts, np.memmap):
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_open_matrix,
+                                 initargs=(args.dataset_dir,)) as pool:
+            list(pool.map(render, order))
+    elif args.workers > 1:
+        # A matrix built from the legacy CSV lives in this process only; ship
+        # each row with its task rather than parse the CSV again per worker
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(render, p, counts=_matrix.row(p)) for p in order]
+            for future in futures:
+                future.result()
+    else:
+        for p in primes:
+            render(p)
+
+    print("Scatter plots generated for all primes.")
+
+
+if __name__ == "__main__":
+    main()